@@ -0,0 +1,351 @@
+-- ============================================================
+-- 002_ocr_jobs.sql
+-- OCR job queue for medical_file.ai_extracted_text
+-- Run after 001_initial.sql
+-- ============================================================
+
+
+-- ============================================================
+-- MEDICAL_FILE: content hash
+-- SHA-256 of the plaintext file, computed by the client before it
+-- encrypts and uploads. Identical scans uploaded to different
+-- profiles share a hash and are OCR'd once. The client value is only
+-- a claim: the worker re-hashes the decrypted plaintext and rejects
+-- the file on mismatch before anything is written to ocr_result.
+-- ============================================================
+alter table medical_file add column content_sha256 text;
+
+create index idx_medical_file_content_sha256 on medical_file(content_sha256);
+
+
+-- ============================================================
+-- OCR_RESULT
+-- One row per distinct file content. Written by the worker when a
+-- job succeeds; later uploads of the same content copy from here.
+-- ============================================================
+create table ocr_result (
+  content_sha256  text primary key,
+  extracted_text  text not null,
+  created_at      timestamptz not null default now()
+);
+
+
+-- ============================================================
+-- OCR_JOB
+-- Persistent queue. One job per distinct content hash; every
+-- medical_file with that hash is updated when the job finishes.
+-- Workers claim jobs with claim_ocr_jobs() (FOR UPDATE SKIP LOCKED).
+-- ============================================================
+create table ocr_job (
+  id               uuid primary key default gen_random_uuid(),
+  content_sha256   text not null unique,
+  file_id          uuid not null references medical_file(id) on delete cascade,
+  -- representative file the worker reads the blob from; deleting it
+  -- moves an unfinished job to another waiting file (trigger below)
+  status           text not null default 'pending'
+                   check (status in ('pending','processing','done','failed')),
+  attempts         int  not null default 0,
+  max_attempts     int  not null default 5,
+  next_attempt_at  timestamptz not null default now(),
+  locked_by        text,
+  locked_at        timestamptz,
+  last_error       text,
+  created_at       timestamptz not null default now(),
+  updated_at       timestamptz not null default now()
+);
+
+create index idx_ocr_job_ready on ocr_job(next_attempt_at) where status = 'pending';
+create index idx_ocr_job_leased on ocr_job(locked_at) where status = 'processing';
+
+create trigger trg_ocr_job_updated_at
+  before update on ocr_job
+  for each row execute function set_updated_at();
+
+-- Queue tables are only touched through the service key.
+alter table ocr_result enable row level security;
+alter table ocr_job    enable row level security;
+
+
+-- ============================================================
+-- Deleting a job's representative file
+-- The job would be cascade-deleted with it, stranding every other
+-- file waiting on the hash in 'processing'. Move an unfinished job to
+-- another waiting file first; if none is left, the cascade removes it.
+-- ============================================================
+create or replace function repoint_ocr_job_on_file_delete()
+returns trigger language plpgsql as $$
+declare
+  v_next_id uuid;
+begin
+  if old.content_sha256 is null then
+    return old;
+  end if;
+
+  select id into v_next_id
+  from   medical_file
+  where  content_sha256 = old.content_sha256
+    and  ocr_status = 'processing'
+    and  id <> old.id
+  order  by uploaded_at
+  limit  1;
+
+  if v_next_id is not null then
+    update ocr_job
+       set status = 'pending', file_id = v_next_id, attempts = 0,
+           next_attempt_at = now(), locked_by = null, locked_at = null
+     where file_id = old.id
+       and status in ('pending', 'processing');
+  end if;
+  return old;
+end;
+$$;
+
+create trigger trg_medical_file_repoint_ocr_job
+  before delete on medical_file
+  for each row execute function repoint_ocr_job_on_file_delete();
+
+
+-- ============================================================
+-- enqueue_ocr_job
+-- Called from POST /profiles/:pid/files/:file_id/confirm.
+-- Returns the file's new ocr_status ('done' on a dedup hit).
+-- ============================================================
+create or replace function enqueue_ocr_job(
+  p_profile_id     uuid,
+  p_file_id        uuid,
+  p_content_sha256 text,
+  p_max_attempts   int default 5
+)
+returns text language plpgsql as $$
+declare
+  v_hash text;
+  v_text text;
+begin
+  v_hash := coalesce(p_content_sha256, p_file_id::text);
+
+  update medical_file
+     set content_sha256 = v_hash
+   where id = p_file_id and profile_id = p_profile_id;
+  if not found then
+    return null;
+  end if;
+
+  select extracted_text into v_text from ocr_result where content_sha256 = v_hash;
+  if found then
+    update medical_file
+       set ai_extracted_text = v_text, ocr_status = 'done'
+     where id = p_file_id;
+    return 'done';
+  end if;
+
+  -- A failed job is retried against the new file, whose content may
+  -- verify where the earlier upload did not. The conflicting row is
+  -- locked even when the WHERE is false, so a concurrent
+  -- complete_ocr_job has committed by the time the re-check below runs.
+  insert into ocr_job (content_sha256, file_id, max_attempts)
+  values (v_hash, p_file_id, p_max_attempts)
+  on conflict (content_sha256) do update
+     set status = 'pending',
+         file_id = excluded.file_id,
+         attempts = 0,
+         max_attempts = excluded.max_attempts,
+         next_attempt_at = now(),
+         last_error = null
+   where ocr_job.status = 'failed';
+
+  select extracted_text into v_text from ocr_result where content_sha256 = v_hash;
+  if found then
+    update medical_file
+       set ai_extracted_text = v_text, ocr_status = 'done'
+     where id = p_file_id;
+    return 'done';
+  end if;
+
+  update medical_file set ocr_status = 'processing' where id = p_file_id;
+  return 'processing';
+end;
+$$;
+
+
+-- ============================================================
+-- claim_ocr_jobs
+-- Leases up to p_limit ready jobs to a worker. Jobs whose lease has
+-- expired (worker died mid-job) are picked up again unless they have
+-- used all attempts; those are failed along with their files, so a job
+-- that keeps crashing its worker is not re-claimed forever.
+-- ============================================================
+create or replace function claim_ocr_jobs(
+  p_worker_id     text,
+  p_limit         int,
+  p_lease_seconds int default 600
+)
+returns table (
+  id             uuid,
+  content_sha256 text,
+  attempts       int,
+  max_attempts   int,
+  file_id        uuid,
+  storage_key    text,
+  mime_type      text,
+  encryption_iv  text
+) language plpgsql as $$
+#variable_conflict use_column
+begin
+  with dead as (
+    update ocr_job j
+       set status = 'failed',
+           locked_by = null,
+           locked_at = null,
+           last_error = coalesce(j.last_error, 'lease expired on final attempt')
+     where j.status = 'processing'
+       and j.attempts >= j.max_attempts
+       and j.locked_at < now() - make_interval(secs => p_lease_seconds)
+    returning j.content_sha256
+  )
+  update medical_file f
+     set ocr_status = 'failed'
+    from dead
+   where f.content_sha256 = dead.content_sha256
+     and f.ocr_status <> 'done';
+
+  return query
+    with ready as (
+      select j.id
+      from   ocr_job j
+      where  (j.status = 'pending' and j.next_attempt_at <= now())
+         or  (j.status = 'processing'
+              and j.attempts < j.max_attempts
+              and j.locked_at < now() - make_interval(secs => p_lease_seconds))
+      order  by j.next_attempt_at
+      limit  p_limit
+      for update skip locked
+    ), claimed as (
+      update ocr_job j
+         set status = 'processing',
+             attempts = j.attempts + 1,
+             locked_by = p_worker_id,
+             locked_at = now()
+        from ready
+       where j.id = ready.id
+      returning j.*
+    )
+    select c.id, c.content_sha256, c.attempts, c.max_attempts,
+           f.id, f.storage_key, f.mime_type, f.encryption_iv
+    from   claimed c
+    join   medical_file f on f.id = c.file_id;
+end;
+$$;
+
+
+-- ============================================================
+-- complete_ocr_job
+-- Stores the text once and fans it out to every file with the hash.
+-- ============================================================
+create or replace function complete_ocr_job(
+  p_job_id uuid,
+  p_text   text
+)
+returns void language plpgsql as $$
+declare
+  v_hash text;
+begin
+  update ocr_job
+     set status = 'done', locked_by = null, locked_at = null, last_error = null
+   where id = p_job_id
+  returning content_sha256 into v_hash;
+  if not found then
+    return;
+  end if;
+
+  insert into ocr_result (content_sha256, extracted_text)
+  values (v_hash, p_text)
+  on conflict (content_sha256) do update set extracted_text = excluded.extracted_text;
+
+  update medical_file
+     set ai_extracted_text = p_text, ocr_status = 'done'
+   where content_sha256 = v_hash;
+end;
+$$;
+
+
+-- ============================================================
+-- fail_ocr_job
+-- p_retry_in_seconds null = give up and mark the files failed.
+-- ============================================================
+create or replace function fail_ocr_job(
+  p_job_id           uuid,
+  p_error            text,
+  p_retry_in_seconds double precision
+)
+returns void language plpgsql as $$
+declare
+  v_hash text;
+begin
+  if p_retry_in_seconds is not null then
+    update ocr_job
+       set status = 'pending',
+           next_attempt_at = now() + make_interval(secs => p_retry_in_seconds),
+           locked_by = null, locked_at = null, last_error = p_error
+     where id = p_job_id;
+    return;
+  end if;
+
+  update ocr_job
+     set status = 'failed', locked_by = null, locked_at = null, last_error = p_error
+   where id = p_job_id
+  returning content_sha256 into v_hash;
+
+  update medical_file
+     set ocr_status = 'failed'
+   where content_sha256 = v_hash and ocr_status <> 'done';
+end;
+$$;
+
+
+-- ============================================================
+-- reject_ocr_file
+-- The job's file did not decrypt to content matching its hash. Only
+-- that file is failed and detached from the hash; the job moves to
+-- another waiting file with the same claimed hash, or fails if none.
+-- ============================================================
+create or replace function reject_ocr_file(
+  p_job_id uuid,
+  p_error  text
+)
+returns void language plpgsql as $$
+declare
+  v_hash    text;
+  v_file_id uuid;
+  v_next_id uuid;
+begin
+  select content_sha256, file_id into v_hash, v_file_id
+  from   ocr_job
+  where  id = p_job_id
+  for update;
+  if not found then
+    return;
+  end if;
+
+  update medical_file
+     set ocr_status = 'failed', content_sha256 = null
+   where id = v_file_id;
+
+  select id into v_next_id
+  from   medical_file
+  where  content_sha256 = v_hash and ocr_status = 'processing'
+  order  by uploaded_at
+  limit  1;
+
+  if v_next_id is null then
+    update ocr_job
+       set status = 'failed', locked_by = null, locked_at = null, last_error = p_error
+     where id = p_job_id;
+  else
+    update ocr_job
+       set status = 'pending', file_id = v_next_id, attempts = 0,
+           next_attempt_at = now(), locked_by = null, locked_at = null,
+           last_error = p_error
+     where id = p_job_id;
+  end if;
+end;
+$$;
@@ -0,0 +1,98 @@
+-- ============================================================
+-- 003_medical_file_search.sql
+-- Ranked search over medical_file.ai_extracted_text
+-- Run after 002_ocr_jobs.sql
+-- ============================================================
+
+-- Trigram index for the fuzzy fallback (typos, partial drug names).
+-- idx_medical_file_fts from 001 serves the tsquery path.
+create index idx_medical_file_trgm on medical_file
+  using gin(ai_extracted_text gin_trgm_ops);
+
+
+-- ============================================================
+-- search_medical_files
+-- Ranked tsquery search, falling back to trigram similarity when the
+-- tsquery matches nothing. Only files on profiles linked to
+-- p_account_id are visible. Keyset pagination on (rank desc, id):
+-- pass back the last row's mode/rank/file_id to fetch the next page.
+--
+-- The to_tsvector expression must match idx_medical_file_fts exactly
+-- or the planner will not use the index.
+-- ============================================================
+create or replace function search_medical_files(
+  p_account_id  uuid,
+  p_profile_id  uuid,
+  p_query       text,
+  p_limit       int default 10,
+  p_mode        text default null,
+  -- null = decide ('fts', else 'trgm'); set from the cursor on later pages
+  p_after_rank  double precision default null,
+  p_after_id    uuid default null
+)
+returns table (
+  mode          text,
+  file_id       uuid,
+  profile_id    uuid,
+  original_name text,
+  file_type     text,
+  uploaded_at   timestamptz,
+  rank          double precision,
+  snippet       text
+) language plpgsql stable as $$
+declare
+  v_query tsquery := websearch_to_tsquery('english', p_query);
+begin
+  if p_mode is null or p_mode = 'fts' then
+    return query
+      with hits as (
+        select f.id, f.profile_id, f.original_name, f.file_type, f.uploaded_at,
+               f.ai_extracted_text,
+               ts_rank(to_tsvector('english', coalesce(f.ai_extracted_text, '')),
+                       v_query)::double precision as rank
+        from   medical_file f
+        join   account_profile ap
+               on ap.profile_id = f.profile_id and ap.account_id = p_account_id
+        where  f.profile_id = p_profile_id
+          and  to_tsvector('english', coalesce(f.ai_extracted_text, '')) @@ v_query
+      ), page as (
+        select * from hits h
+        where  p_after_rank is null or (h.rank, h.id) < (p_after_rank, p_after_id)
+        order  by h.rank desc, h.id desc
+        limit  p_limit
+      )
+      select 'fts'::text, p.id, p.profile_id, p.original_name, p.file_type,
+             p.uploaded_at, p.rank,
+             ts_headline('english', p.ai_extracted_text, v_query,
+                         'MaxFragments=2, MinWords=5, MaxWords=20, StartSel=**, StopSel=**')
+      from   page p
+      order  by p.rank desc, p.id desc;
+
+    if found or p_mode = 'fts' then
+      return;
+    end if;
+  end if;
+
+  return query
+    with hits as (
+      select f.id, f.profile_id, f.original_name, f.file_type, f.uploaded_at,
+             f.ai_extracted_text,
+             word_similarity(p_query, f.ai_extracted_text)::double precision as rank
+      from   medical_file f
+      join   account_profile ap
+             on ap.profile_id = f.profile_id and ap.account_id = p_account_id
+      where  f.profile_id = p_profile_id
+        and  p_query <% f.ai_extracted_text
+    ), page as (
+      select * from hits h
+      where  p_after_rank is null or (h.rank, h.id) < (p_after_rank, p_after_id)
+      order  by h.rank desc, h.id desc
+      limit  p_limit
+    )
+    select 'trgm'::text, p.id, p.profile_id, p.original_name, p.file_type,
+           p.uploaded_at, p.rank,
+           left(p.ai_extracted_text, 200)
+    from   page p
+    order  by p.rank desc, p.id desc;
+end;
+$$;
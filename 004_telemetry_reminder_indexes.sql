@@ -0,0 +1,21 @@
+-- migrate:no-transaction
+-- ============================================================
+-- 004_telemetry_reminder_indexes.sql
+-- Indexes for the telemetry list and reminder schedule queries.
+-- Built CONCURRENTLY so writes to these large tables are not blocked;
+-- the runner executes this file outside a transaction, drops INVALID
+-- leftovers of these indexes before a retry, and stops if a build ends
+-- INVALID, so the drop below only runs once its replacement is valid.
+-- ============================================================
+
+-- GET /profiles/:pid/telemetry?metric_type=...  (newest first)
+create index concurrently if not exists idx_telemetry_profile_type_recorded
+  on telemetry(profile_id, metric_type, recorded_at desc);
+
+-- Superseded by the index above (same leading columns). Keep this after
+-- the create: it must not run unless that build succeeded.
+drop index concurrently if exists idx_telemetry_profile_type;
+
+-- Per-account reminder schedule (GET /profiles/:pid/reminders/today, push fan-out)
+create index concurrently if not exists idx_reminder_log_account_scheduled
+  on reminder_log(account_id, scheduled_at);
@@ -0,0 +1,89 @@
+-- ============================================================
+-- 005_account_write_behind.sql
+-- Bulk apply of buffered push-token / notif_prefs writes
+-- Run after 004_telemetry_reminder_indexes.sql
+-- ============================================================
+
+-- ============================================================
+-- ACCOUNT: per-field write times
+-- Each gunicorn worker buffers and flushes on its own timer, so two
+-- writes for one account can reach the database out of order. Buffered
+-- writes carry the epoch time they were accepted; the stored time per
+-- field lets apply_account_settings drop anything older.
+-- Keys: 'expo_push_token', 'notif_prefs.<pref key>'.
+-- ============================================================
+alter table account
+  add column settings_written_at jsonb not null default '{}'::jsonb;
+
+
+-- ============================================================
+-- apply_account_settings
+-- p_rows: [{ "id": uuid, "expo_push_token"?: text, "notif_prefs"?: {...},
+--            "written_at": { "expo_push_token"?: epoch,
+--                            "notif_prefs.<key>"?: epoch } }]
+-- One row per account. A key that is absent leaves the column alone;
+-- notif_prefs is a shallow merge onto the stored object. A field is only
+-- written when its written_at is newer than the stored one (last write
+-- wins across workers); a missing written_at counts as now().
+-- Returns the number of accounts updated.
+-- ============================================================
+create or replace function apply_account_settings(p_rows jsonb)
+returns int language plpgsql as $$
+declare
+  v_row    jsonb;
+  v_id     uuid;
+  v_stamps jsonb;
+  v_now    double precision := extract(epoch from now());
+  v_at     double precision;
+  v_token  text;
+  v_set_token boolean;
+  v_prefs  jsonb;
+  v_key    text;
+  v_count  int := 0;
+begin
+  -- Lock accounts in id order so concurrent flushes cannot deadlock.
+  for v_row in select value from jsonb_array_elements(p_rows) order by value->>'id' loop
+    v_id := (v_row->>'id')::uuid;
+
+    select settings_written_at into v_stamps
+    from   account
+    where  id = v_id
+    for update;
+    if not found then
+      continue;
+    end if;
+
+    v_set_token := false;
+    if v_row ? 'expo_push_token' then
+      v_at := coalesce((v_row->'written_at'->>'expo_push_token')::double precision, v_now);
+      if v_at > coalesce((v_stamps->>'expo_push_token')::double precision, 0) then
+        v_set_token := true;
+        v_token := v_row->>'expo_push_token';
+        v_stamps := v_stamps || jsonb_build_object('expo_push_token', v_at);
+      end if;
+    end if;
+
+    v_prefs := '{}'::jsonb;
+    for v_key in select jsonb_object_keys(coalesce(v_row->'notif_prefs', '{}'::jsonb)) loop
+      v_at := coalesce(
+        (v_row->'written_at'->>('notif_prefs.' || v_key))::double precision, v_now
+      );
+      if v_at > coalesce((v_stamps->>('notif_prefs.' || v_key))::double precision, 0) then
+        v_prefs := v_prefs || jsonb_build_object(v_key, v_row->'notif_prefs'->v_key);
+        v_stamps := v_stamps || jsonb_build_object('notif_prefs.' || v_key, v_at);
+      end if;
+    end loop;
+
+    if v_set_token or v_prefs <> '{}'::jsonb then
+      update account
+         set expo_push_token = case when v_set_token then v_token else expo_push_token end,
+             notif_prefs = notif_prefs || v_prefs,
+             settings_written_at = v_stamps
+       where id = v_id;
+      v_count := v_count + 1;
+    end if;
+  end loop;
+
+  return v_count;
+end;
+$$;
@@ -23,6 +23,16 @@ def _split_csv(value: str | None) -> list[str]:
     return [item.strip() for item in value.split(",") if item.strip()]
 
 
+def _int_env(name: str, default: int) -> int:
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError as exc:
+        raise RuntimeError(f"Env var {name} must be an integer, got {value!r}") from exc
+
+
 @dataclass(frozen=True)
 class Settings:
     supabase_url: str
@@ -31,6 +41,30 @@ class Settings:
     supabase_jwt_issuer: str
     supabase_jwks_url: str
     cors_origins: list[str]
+    storage_bucket: str
+    ocr_engine: str
+    ocr_worker_processes: int
+    ocr_worker_concurrency: int
+    ocr_max_attempts: int
+    file_key_provider: str
+    file_encryption_key: str | None
+    suggestions_generator: str
+    suggestions_ttl_seconds: int
+    suggestions_cache_size: int
+    login_throttle_backend: str
+    login_identifier_burst: int
+    login_identifier_per_minute: int
+    login_identifier_global_burst: int
+    login_identifier_global_per_minute: int
+    login_ip_burst: int
+    login_ip_per_minute: int
+    login_throttle_max_keys: int
+    redis_url: str | None
+    alert_state_max_keys: int
+    shared_cache_dir: str | None
+    write_behind_enabled: bool
+    write_behind_interval_ms: int
+    write_behind_max_pending: int
 
 
 _settings: Settings | None = None
@@ -55,6 +89,31 @@ def get_settings() -> Settings:
             supabase_jwt_issuer=issuer,
             supabase_jwks_url=jwks_url,
             cors_origins=_split_csv(os.getenv("CORS_ORIGINS")),
+            storage_bucket=os.getenv("STORAGE_BUCKET", "medical-files"),
+            ocr_engine=os.getenv("OCR_ENGINE", "stub"),
+            ocr_worker_processes=_int_env("OCR_WORKER_PROCESSES", 2),
+            ocr_worker_concurrency=_int_env("OCR_WORKER_CONCURRENCY", 4),
+            ocr_max_attempts=_int_env("OCR_MAX_ATTEMPTS", 5),
+            file_key_provider=os.getenv("FILE_KEY_PROVIDER", "env"),
+            file_encryption_key=os.getenv("FILE_ENCRYPTION_KEY") or None,
+            suggestions_generator=os.getenv("SUGGESTIONS_GENERATOR", "stub"),
+            suggestions_ttl_seconds=_int_env("SUGGESTIONS_TTL_SECONDS", 24 * 3600),
+            suggestions_cache_size=_int_env("SUGGESTIONS_CACHE_SIZE", 1024),
+            login_throttle_backend=os.getenv("LOGIN_THROTTLE_BACKEND", "memory"),
+            login_identifier_burst=_int_env("LOGIN_IDENTIFIER_BURST", 5),
+            login_identifier_per_minute=_int_env("LOGIN_IDENTIFIER_PER_MINUTE", 5),
+            login_identifier_global_burst=_int_env("LOGIN_IDENTIFIER_GLOBAL_BURST", 60),
+            login_identifier_global_per_minute=_int_env("LOGIN_IDENTIFIER_GLOBAL_PER_MINUTE", 60),
+            login_ip_burst=_int_env("LOGIN_IP_BURST", 20),
+            login_ip_per_minute=_int_env("LOGIN_IP_PER_MINUTE", 30),
+            login_throttle_max_keys=_int_env("LOGIN_THROTTLE_MAX_KEYS", 100_000),
+            redis_url=os.getenv("REDIS_URL") or None,
+            alert_state_max_keys=_int_env("ALERT_STATE_MAX_KEYS", 50_000),
+            shared_cache_dir=os.getenv("SHARED_CACHE_DIR") or None,
+            write_behind_enabled=os.getenv("WRITE_BEHIND_ENABLED", "false").lower()
+            in ("1", "true", "yes"),
+            write_behind_interval_ms=_int_env("WRITE_BEHIND_INTERVAL_MS", 500),
+            write_behind_max_pending=_int_env("WRITE_BEHIND_MAX_PENDING", 500),
         )
 
     return _settings
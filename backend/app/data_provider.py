@@ -1,13 +1,18 @@
 from __future__ import annotations
 
+import copy
 from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 import os
 from typing import Any, TypedDict, cast
 
+from postgrest.exceptions import APIError
 from supabase import Client, create_client
 from supabase_auth.errors import AuthApiError
 
 from .config import get_settings
+from .services.write_behind import AccountWriteBuffer
+from .utils.singleflight import SingleFlight
 
 
 class ProviderError(Exception):
@@ -39,6 +44,15 @@ class SupabaseProvider:
         self._service: Client = create_client(
             settings.supabase_url, settings.supabase_secret_key
         )
+        self._reads: SingleFlight[Any] = SingleFlight()
+        self._writes: AccountWriteBuffer | None = None
+        if settings.write_behind_enabled:
+            self._writes = AccountWriteBuffer(
+                self._apply_account_settings,
+                settings.write_behind_interval_ms / 1000.0,
+                settings.write_behind_max_pending,
+            )
+            self._writes.start()
 
     def register_account(self, username: str, email: str, mobile: str, password: str) -> str:
         # --- STEP 1: PRE-FLIGHT CHECKS (Do this BEFORE calling Auth) ---
@@ -119,11 +133,17 @@ class SupabaseProvider:
         )
 
     def update_push_token(self, account_id: str, expo_push_token: str) -> None:
+        if self._writes is not None:
+            self._writes.set_push_token(account_id, expo_push_token)
+            return
+
         self._service.table("account").update({"expo_push_token": expo_push_token}).eq(
             "id", account_id
         ).execute()
 
     def update_notif_prefs(self, account_id: str, updates: dict[str, Any]) -> dict[str, Any]:
+        # The response is the full prefs object, so this read runs on every
+        # call even with write-behind on; only the write is deferred.
         current = (
             self._service.table("account")
             .select("notif_prefs")
@@ -135,6 +155,14 @@ class SupabaseProvider:
         )
         current_dict = cast(dict[str, Any], current)
         current_prefs = cast(dict[str, Any], current_dict.get("notif_prefs") or {})
+
+        if self._writes is not None:
+            pending = self._writes.pending(account_id) or {}
+            current_prefs.update(pending.get("notif_prefs") or {})
+            current_prefs.update(updates)
+            self._writes.merge_notif_prefs(account_id, updates)
+            return current_prefs
+
         current_prefs.update(updates)
 
         self._service.table("account").update({"notif_prefs": current_prefs}).eq(
@@ -173,13 +201,16 @@ class SupabaseProvider:
         return profile
 
     def link_profile(self, account_id: str, profile_id: str, relation: str) -> dict:
-        profile_result = (
-            self._service.table("profile")
-            .select("*")
-            .eq("id", profile_id)
-            .limit(1)
-            .execute()
-            .data
+        profile_result, _ = self._reads.do(
+            ("profile_row", profile_id),
+            lambda: (
+                self._service.table("profile")
+                .select("*")
+                .eq("id", profile_id)
+                .limit(1)
+                .execute()
+                .data
+            ),
         )
         if not profile_result:
             raise ProviderError("Profile not found", 404)
@@ -193,7 +224,7 @@ class SupabaseProvider:
             on_conflict="account_id,profile_id",
         ).execute()
 
-        return cast(dict[str, Any], profile_result[0])
+        return copy.deepcopy(cast(dict[str, Any], profile_result[0]))
 
     def list_profiles(self, account_id: str) -> list[dict]:
         links = (
@@ -258,6 +289,15 @@ class SupabaseProvider:
         return result
 
     def get_profile(self, profile_id: str) -> tuple[dict, list[dict]]:
+        # Linked accounts often open the same profile together; concurrent
+        # callers share one upstream read. Access is checked per caller
+        # before this is reached.
+        (profile, linked_accounts), _ = self._reads.do(
+            ("get_profile", profile_id), lambda: self._fetch_profile_detail(profile_id)
+        )
+        return copy.deepcopy(profile), copy.deepcopy(linked_accounts)
+
+    def _fetch_profile_detail(self, profile_id: str) -> tuple[dict, list[dict]]:
         profile = (
             self._service.table("profile")
             .select("*")
@@ -308,6 +348,206 @@ class SupabaseProvider:
 
         return cast(dict[str, Any], profile)
 
+    def enqueue_ocr_job(
+        self,
+        profile_id: str,
+        file_id: str,
+        content_sha256: str | None,
+        max_attempts: int,
+    ) -> str:
+        ocr_status = self._service.rpc(
+            "enqueue_ocr_job",
+            {
+                "p_profile_id": profile_id,
+                "p_file_id": file_id,
+                "p_content_sha256": content_sha256,
+                "p_max_attempts": max_attempts,
+            },
+        ).execute().data
+        if not ocr_status:
+            raise ProviderError("File not found", 404)
+
+        return cast(str, ocr_status)
+
+    def get_ocr_status(self, profile_id: str, file_id: str) -> str:
+        rows = (
+            self._service.table("medical_file")
+            .select("ocr_status")
+            .eq("id", file_id)
+            .eq("profile_id", profile_id)
+            .limit(1)
+            .execute()
+            .data
+        )
+        if not rows:
+            raise ProviderError("File not found", 404)
+
+        return cast(dict[str, Any], rows[0])["ocr_status"]
+
+    def claim_ocr_jobs(self, worker_id: str, limit: int, lease_seconds: int) -> list[dict]:
+        jobs = self._service.rpc(
+            "claim_ocr_jobs",
+            {"p_worker_id": worker_id, "p_limit": limit, "p_lease_seconds": lease_seconds},
+        ).execute().data
+
+        return cast(list[dict[str, Any]], jobs or [])
+
+    def complete_ocr_job(self, job_id: str, text: str) -> None:
+        self._service.rpc("complete_ocr_job", {"p_job_id": job_id, "p_text": text}).execute()
+
+    def fail_ocr_job(self, job_id: str, error: str, retry_in_seconds: float | None) -> None:
+        self._service.rpc(
+            "fail_ocr_job",
+            {"p_job_id": job_id, "p_error": error, "p_retry_in_seconds": retry_in_seconds},
+        ).execute()
+
+    def reject_ocr_file(self, job_id: str, error: str) -> None:
+        self._service.rpc("reject_ocr_file", {"p_job_id": job_id, "p_error": error}).execute()
+
+    def search_medical_files(
+        self,
+        account_id: str,
+        profile_id: str,
+        query: str,
+        limit: int,
+        mode: str | None = None,
+        after: tuple[float, str] | None = None,
+    ) -> list[dict]:
+        after_rank, after_id = after if after else (None, None)
+        try:
+            rows = self._service.rpc(
+                "search_medical_files",
+                {
+                    "p_account_id": account_id,
+                    "p_profile_id": profile_id,
+                    "p_query": query,
+                    "p_limit": limit,
+                    "p_mode": mode,
+                    "p_after_rank": after_rank,
+                    "p_after_id": after_id,
+                },
+            ).execute().data
+        except APIError as exc:
+            # SQLSTATE class 22 = bad input (malformed query or cursor values).
+            status_code = 400 if (exc.code or "").startswith("22") else 500
+            raise ProviderError(exc.message or "Search failed", status_code) from exc
+
+        return cast(list[dict[str, Any]], rows or [])
+
+    def get_suggestion_inputs(self, profile_id: str, telemetry_days: int = 30) -> dict[str, list[dict]]:
+        since = (datetime.now(timezone.utc) - timedelta(days=telemetry_days)).isoformat()
+
+        medications = (
+            self._service.table("medication")
+            .select("id, name, dosage, frequency, updated_at")
+            .eq("profile_id", profile_id)
+            .eq("active", True)
+            .order("id")
+            .execute()
+            .data
+            or []
+        )
+        allergies = (
+            self._service.table("allergy")
+            .select("id, name, severity, notes")
+            .eq("profile_id", profile_id)
+            .order("id")
+            .execute()
+            .data
+            or []
+        )
+        conditions = (
+            self._service.table("chronic_condition")
+            .select("id, name, status, updated_at")
+            .eq("profile_id", profile_id)
+            .neq("status", "resolved")
+            .order("id")
+            .execute()
+            .data
+            or []
+        )
+        telemetry = (
+            self._service.table("telemetry")
+            .select("id, metric_type, value, unit, recorded_at")
+            .eq("profile_id", profile_id)
+            .gte("recorded_at", since)
+            .order("recorded_at", desc=True)
+            .order("id")
+            .limit(200)
+            .execute()
+            .data
+            or []
+        )
+
+        return {
+            "medications": cast(list[dict[str, Any]], medications),
+            "allergies": cast(list[dict[str, Any]], allergies),
+            "chronic_conditions": cast(list[dict[str, Any]], conditions),
+            "telemetry": cast(list[dict[str, Any]], telemetry),
+        }
+
+    def create_telemetry(
+        self, profile_id: str, account_id: str, readings: list[dict[str, Any]]
+    ) -> list[dict]:
+        rows = [
+            {**reading, "profile_id": profile_id, "recorded_by": account_id}
+            for reading in readings
+        ]
+        # default_to_null=False: rows without recorded_at get the column default (now()).
+        inserted = (
+            self._service.table("telemetry").insert(rows, default_to_null=False).execute().data
+        )
+        if not inserted:
+            raise ProviderError("Create failed", 400)
+
+        return cast(list[dict[str, Any]], inserted)
+
+    def list_alert_recipients(self, profile_id: str) -> list[dict]:
+        links = (
+            self._service.table("account_profile")
+            .select("account_id, account:account_id(expo_push_token, notif_prefs)")
+            .eq("profile_id", profile_id)
+            .execute()
+            .data
+            or []
+        )
+
+        recipients: list[dict] = []
+        for row in cast(list[dict[str, Any]], links):
+            account = row.get("account") or {}
+            recipient = {
+                "account_id": row.get("account_id"),
+                "expo_push_token": account.get("expo_push_token"),
+                "notif_prefs": account.get("notif_prefs"),
+            }
+            if self._writes is not None:
+                pending = self._writes.pending(recipient["account_id"]) or {}
+                if "expo_push_token" in pending:
+                    recipient["expo_push_token"] = pending["expo_push_token"]
+                if "notif_prefs" in pending:
+                    recipient["notif_prefs"] = {
+                        **(recipient["notif_prefs"] or {}),
+                        **pending["notif_prefs"],
+                    }
+            recipients.append(recipient)
+
+        return recipients
+
+    def _apply_account_settings(self, rows: list[dict[str, Any]]) -> None:
+        self._service.rpc("apply_account_settings", {"p_rows": rows}).execute()
+
+    def close(self) -> None:
+        if self._writes is not None:
+            self._writes.close()
+
+    def read_coalescing_stats(self) -> dict[str, int]:
+        """``shared`` is the number of upstream reads saved by coalescing."""
+        return self._reads.stats()
+
+    def download_file(self, storage_key: str) -> bytes:
+        settings = get_settings()
+        return self._service.storage.from_(settings.storage_bucket).download(storage_key)
+
 
 _provider: SupabaseProvider | None = None
 
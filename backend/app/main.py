@@ -1,16 +1,54 @@
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
+import logging
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .config import get_settings
-from .routers import auth, profiles
+from .data_provider import get_data_provider
+from .routers import ai, auth, files, profiles, telemetry
+from .services.ai_service import get_suggestion_service
+from .services.telemetry_alerts import get_alert_engine
+from .utils.rate_limit import get_login_throttle
+from .utils.security import jwks_fetch_stats, prefetch_jwks
+
+
+logger = logging.getLogger(__name__)
+
+def warm_up() -> None:
+    """Builds per-process singletons and loads JWKS before traffic arrives.
+
+    Runs in each worker during lifespan startup, which uvicorn completes
+    before it accepts connections. With SHARED_CACHE_DIR set, only one
+    worker per host fetches JWKS.
+    """
+    get_settings()
+    get_data_provider()
+    get_login_throttle()
+    get_suggestion_service()
+    get_alert_engine()
+    try:
+        prefetch_jwks()
+    except Exception as exc:
+        # Token verification retries the fetch on first use.
+        logger.warning("JWKS warm-up failed: %s", exc)
+
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI) -> AsyncIterator[None]:
+    warm_up()
+    yield
+    # Flush buffered account writes before the worker exits.
+    get_data_provider().close()
 
 
 def create_app() -> FastAPI:
     settings = get_settings()
 
-    app = FastAPI(title="MediNodus API")
+    app = FastAPI(title="MediNodus API", lifespan=_lifespan)
 
     if settings.cors_origins:
         app.add_middleware(
@@ -23,6 +61,20 @@ def create_app() -> FastAPI:
 
     app.include_router(auth.router)
     app.include_router(profiles.router)
+    app.include_router(telemetry.router)
+    app.include_router(files.router)
+    app.include_router(ai.router)
+
+    @app.get("/health", include_in_schema=False)
+    def health() -> dict:
+        # Counters only (no keys), per worker process. "shared" counts the
+        # upstream reads saved by request coalescing.
+        return {
+            "ok": True,
+            "login_throttle": get_login_throttle().metrics(),
+            "read_coalescing": get_data_provider().read_coalescing_stats(),
+            "jwks_fetch": jwks_fetch_stats(),
+        }
 
     return app
 
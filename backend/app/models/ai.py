@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class SearchRequest(BaseModel):
+    query: str = Field(min_length=1, max_length=500)
+    limit: int = Field(default=10, ge=1, le=50)
+    cursor: Optional[str] = None
+
+
+class SearchSource(BaseModel):
+    file_id: str
+    original_name: Optional[str] = None
+    file_type: Optional[str] = None
+    uploaded_at: Optional[str] = None
+    rank: float
+    snippet: str
+
+
+class SearchResponse(BaseModel):
+    answer: Optional[str] = None
+    sources: list[SearchSource]
+    next_cursor: Optional[str] = None
+
+
+class SuggestionsResponse(BaseModel):
+    suggestions: list[str]
+    generated_at: datetime
+    disclaimer: str
+    cached: bool
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+OcrStatus = Literal["pending", "processing", "done", "failed"]
+
+
+class FileConfirmRequest(BaseModel):
+    # SHA-256 of the plaintext, hex encoded; enables OCR dedup across uploads.
+    content_sha256: Optional[str] = Field(default=None, pattern=r"^[0-9a-f]{64}$")
+
+
+class FileConfirmResponse(BaseModel):
+    file_id: str
+    ocr_status: OcrStatus
+
+
+class OcrStatusResponse(BaseModel):
+    ocr_status: OcrStatus
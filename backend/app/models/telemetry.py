@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+MetricType = Literal[
+    "bp_systolic",
+    "bp_diastolic",
+    "blood_glucose",
+    "spo2",
+    "heart_rate",
+    "weight",
+    "temperature",
+    "respiratory_rate",
+]
+
+
+class TelemetryCreateRequest(BaseModel):
+    metric_type: MetricType
+    value: float
+    unit: str
+    recorded_at: Optional[datetime] = None
+    notes: Optional[str] = None
+
+
+class TelemetryBatchRequest(BaseModel):
+    readings: list[TelemetryCreateRequest] = Field(min_length=1, max_length=500)
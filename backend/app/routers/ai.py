@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+import math
+import uuid
+
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from ..data_provider import ProviderError, get_data_provider
+from ..models.ai import SearchRequest, SearchResponse, SearchSource, SuggestionsResponse
+from ..models.medical_file import OcrStatusResponse
+from ..services.ai_service import DISCLAIMER, get_suggestion_service
+from ..utils.security import get_current_account_id
+
+
+router = APIRouter(prefix="/profiles/{profile_id}/ai", tags=["ai"])
+
+
+def _ensure_profile_access(account_id: str, profile_id: str) -> None:
+    provider = get_data_provider()
+    try:
+        provider.ensure_profile_access(account_id, profile_id)
+    except ProviderError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.message) from exc
+
+
+def _encode_cursor(row: dict) -> str:
+    raw = json.dumps([row["mode"], row["rank"], row["file_id"]]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[str, float, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        mode, rank, file_id = json.loads(raw)
+        if mode not in ("fts", "trgm"):
+            raise ValueError(mode)
+        rank = float(rank)
+        if not math.isfinite(rank):
+            raise ValueError(rank)
+        return mode, rank, str(uuid.UUID(file_id))
+    except (binascii.Error, ValueError, TypeError, AttributeError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from exc
+
+
+@router.post("/search", response_model=SearchResponse)
+def search(
+    profile_id: str,
+    payload: SearchRequest,
+    account_id: str = Depends(get_current_account_id),
+) -> SearchResponse:
+    _ensure_profile_access(account_id, profile_id)
+
+    mode = None
+    after = None
+    if payload.cursor:
+        mode, after_rank, after_id = _decode_cursor(payload.cursor)
+        after = (after_rank, after_id)
+
+    provider = get_data_provider()
+    try:
+        rows = provider.search_medical_files(
+            account_id, profile_id, payload.query, payload.limit + 1, mode=mode, after=after
+        )
+    except ProviderError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.message) from exc
+
+    page = rows[: payload.limit]
+    next_cursor = _encode_cursor(page[-1]) if len(rows) > payload.limit else None
+
+    return SearchResponse(
+        sources=[SearchSource(**row) for row in page],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/suggestions", response_model=SuggestionsResponse)
+def get_suggestions(
+    profile_id: str,
+    account_id: str = Depends(get_current_account_id),
+) -> SuggestionsResponse:
+    _ensure_profile_access(account_id, profile_id)
+
+    provider = get_data_provider()
+    inputs = provider.get_suggestion_inputs(profile_id)
+    result, cached = get_suggestion_service().get_suggestions(profile_id, inputs)
+
+    return SuggestionsResponse(
+        suggestions=result.suggestions,
+        generated_at=result.generated_at,
+        disclaimer=DISCLAIMER,
+        cached=cached,
+    )
+
+
+@router.get("/ocr-status/{file_id}", response_model=OcrStatusResponse)
+def get_ocr_status(
+    profile_id: str,
+    file_id: str,
+    account_id: str = Depends(get_current_account_id),
+) -> OcrStatusResponse:
+    _ensure_profile_access(account_id, profile_id)
+
+    provider = get_data_provider()
+    try:
+        ocr_status = provider.get_ocr_status(profile_id, file_id)
+    except ProviderError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.message) from exc
+
+    return OcrStatusResponse(ocr_status=ocr_status)
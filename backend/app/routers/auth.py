@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import math
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 
 from ..data_provider import ProviderError, get_data_provider
 from ..models.account import (
@@ -12,6 +14,7 @@ from ..models.account import (
     RegisterRequest,
     RegisterResponse,
 )
+from ..utils.rate_limit import get_login_throttle
 from ..utils.security import get_current_account_id
 
 
@@ -32,7 +35,16 @@ def register(payload: RegisterRequest) -> RegisterResponse:
 
 
 @router.post("/login", response_model=LoginResponse)
-def login(payload: LoginRequest) -> LoginResponse:
+def login(payload: LoginRequest, request: Request) -> LoginResponse:
+    client_ip = request.client.host if request.client else None
+    retry_after = get_login_throttle().check(payload.identifier, client_ip)
+    if retry_after > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
     provider = get_data_provider()
 
     try:
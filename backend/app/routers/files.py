@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from ..config import get_settings
+from ..data_provider import ProviderError, get_data_provider
+from ..models.medical_file import FileConfirmRequest, FileConfirmResponse
+from ..utils.security import get_current_account_id
+
+
+router = APIRouter(prefix="/profiles/{profile_id}/files", tags=["files"])
+
+
+def _ensure_profile_access(account_id: str, profile_id: str) -> None:
+    provider = get_data_provider()
+    try:
+        provider.ensure_profile_access(account_id, profile_id)
+    except ProviderError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.message) from exc
+
+
+@router.post("/{file_id}/confirm", response_model=FileConfirmResponse)
+def confirm_upload(
+    profile_id: str,
+    file_id: str,
+    payload: FileConfirmRequest,
+    account_id: str = Depends(get_current_account_id),
+) -> FileConfirmResponse:
+    _ensure_profile_access(account_id, profile_id)
+
+    settings = get_settings()
+    provider = get_data_provider()
+    try:
+        ocr_status = provider.enqueue_ocr_job(
+            profile_id, file_id, payload.content_sha256, settings.ocr_max_attempts
+        )
+    except ProviderError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.message) from exc
+
+    return FileConfirmResponse(file_id=file_id, ocr_status=ocr_status)
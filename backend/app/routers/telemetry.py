@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from dataclasses import asdict
+from datetime import datetime
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+
+from ..data_provider import ProviderError, get_data_provider
+from ..models.telemetry import TelemetryBatchRequest, TelemetryCreateRequest
+from ..services.notification_service import send_telemetry_alerts
+from ..services.telemetry_alerts import Reading, canonical_value, get_alert_engine
+from ..utils.security import get_current_account_id
+
+
+router = APIRouter(prefix="/profiles/{profile_id}/telemetry", tags=["telemetry"])
+
+
+def _ensure_profile_access(account_id: str, profile_id: str) -> None:
+    provider = get_data_provider()
+    try:
+        provider.ensure_profile_access(account_id, profile_id)
+    except ProviderError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.message) from exc
+
+
+def _ingest(
+    profile_id: str,
+    account_id: str,
+    readings: list[TelemetryCreateRequest],
+    background_tasks: BackgroundTasks,
+) -> tuple[list[dict], list[dict]]:
+    rows = []
+    for reading in readings:
+        row = reading.dict(exclude_none=True)
+        if reading.recorded_at is not None:
+            row["recorded_at"] = reading.recorded_at.isoformat()
+        rows.append(row)
+
+    provider = get_data_provider()
+    try:
+        inserted = provider.create_telemetry(profile_id, account_id, rows)
+    except ProviderError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.message) from exc
+
+    # Rules are written in fixed units; readings in a unit we cannot convert
+    # are stored but not evaluated.
+    evaluated = []
+    for row in inserted:
+        value = canonical_value(row["metric_type"], float(row["value"]), row.get("unit"))
+        if value is None:
+            continue
+        evaluated.append(
+            Reading(
+                profile_id=row["profile_id"],
+                metric_type=row["metric_type"],
+                value=value,
+                recorded_at=datetime.fromisoformat(row["recorded_at"]).timestamp(),
+            )
+        )
+    alerts = get_alert_engine().evaluate_batch(evaluated)
+    if alerts:
+        background_tasks.add_task(send_telemetry_alerts, alerts)
+
+    return inserted, [asdict(alert) for alert in alerts]
+
+
+@router.post("", response_model=dict)
+def log_reading(
+    profile_id: str,
+    payload: TelemetryCreateRequest,
+    background_tasks: BackgroundTasks,
+    account_id: str = Depends(get_current_account_id),
+) -> dict:
+    _ensure_profile_access(account_id, profile_id)
+
+    inserted, alerts = _ingest(profile_id, account_id, [payload], background_tasks)
+
+    return {"telemetry": inserted[0], "alerts": alerts}
+
+
+@router.post("/batch", response_model=dict)
+def log_readings(
+    profile_id: str,
+    payload: TelemetryBatchRequest,
+    background_tasks: BackgroundTasks,
+    account_id: str = Depends(get_current_account_id),
+) -> dict:
+    _ensure_profile_access(account_id, profile_id)
+
+    inserted, alerts = _ingest(profile_id, account_id, payload.readings, background_tasks)
+
+    return {"telemetry": inserted, "alerts": alerts}
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Callable, Protocol
+
+from ..config import get_settings
+from ..utils.singleflight import SingleFlight
+
+
+DISCLAIMER = (
+    "These suggestions are general wellness information, not medical advice. "
+    "Check with your doctor before changing diet, exercise or medication."
+)
+
+SuggestionInputs = dict[str, list[dict[str, Any]]]
+
+
+class SuggestionGenerator(Protocol):
+    def generate(self, inputs: SuggestionInputs) -> list[str]:
+        ...
+
+
+class StubSuggestionGenerator:
+    """Deterministic rule-based suggestions for local dev and tests."""
+
+    _CONDITION_TIPS = {
+        "diabetes": "Prefer high-fibre, low-glycaemic meals and spread carbohydrates through the day.",
+        "hypertension": "Keep salt low and aim for 30 minutes of brisk walking most days.",
+        "asthma": "Warm up slowly before exercise and keep your reliever inhaler nearby.",
+        "thyroid": "Take thyroid medication on an empty stomach, apart from calcium or iron.",
+        "cholesterol": "Swap saturated fats for nuts, oily fish and olive oil.",
+    }
+
+    def generate(self, inputs: SuggestionInputs) -> list[str]:
+        suggestions: list[str] = []
+
+        for condition in inputs.get("chronic_conditions", []):
+            name = str(condition.get("name", "")).lower()
+            for keyword, tip in self._CONDITION_TIPS.items():
+                if keyword in name and tip not in suggestions:
+                    suggestions.append(tip)
+
+        for allergy in inputs.get("allergies", []):
+            suggestions.append(f"Check food labels for {allergy.get('name')}.")
+
+        if inputs.get("medications"):
+            suggestions.append("Take medications at the same times each day; set reminders for each dose.")
+
+        metric_types = sorted({row.get("metric_type") for row in inputs.get("telemetry", [])})
+        if metric_types:
+            suggestions.append(f"Keep logging {', '.join(str(m) for m in metric_types)} to track trends.")
+
+        suggestions.append("Drink enough water and aim for 7-8 hours of sleep.")
+        return suggestions
+
+
+_generators: dict[str, Callable[[], SuggestionGenerator]] = {
+    "stub": StubSuggestionGenerator,
+}
+
+
+def register_suggestion_generator(name: str, factory: Callable[[], SuggestionGenerator]) -> None:
+    _generators[name] = factory
+
+
+def fingerprint(inputs: SuggestionInputs) -> str:
+    """Content hash of the generator inputs; changes only when a row does."""
+    canonical = json.dumps(inputs, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class SuggestionResult:
+    fingerprint: str
+    suggestions: list[str]
+    generated_at: datetime
+    expires_at: float
+
+
+class SuggestionCache:
+    """Per-profile TTL cache with LRU eviction.
+
+    Each profile holds one entry, tagged with the fingerprint it was
+    generated from; a lookup with a different fingerprint is a miss and the
+    next put replaces the stale entry.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int) -> None:
+        self._ttl = ttl_seconds
+        self._max_entries = max(max_entries, 1)
+        self._entries: OrderedDict[str, SuggestionResult] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, profile_id: str, input_fingerprint: str) -> SuggestionResult | None:
+        with self._lock:
+            entry = self._entries.get(profile_id)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.monotonic():
+                del self._entries[profile_id]
+                return None
+            if entry.fingerprint != input_fingerprint:
+                return None
+            self._entries.move_to_end(profile_id)
+            return entry
+
+    def put(self, profile_id: str, input_fingerprint: str, suggestions: list[str]) -> SuggestionResult:
+        entry = SuggestionResult(
+            fingerprint=input_fingerprint,
+            suggestions=suggestions,
+            generated_at=datetime.now(timezone.utc),
+            expires_at=time.monotonic() + self._ttl,
+        )
+        with self._lock:
+            self._entries[profile_id] = entry
+            self._entries.move_to_end(profile_id)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+
+class SuggestionService:
+    def __init__(self, generator: SuggestionGenerator, cache: SuggestionCache) -> None:
+        self._generator = generator
+        self._cache = cache
+        self._flight: SingleFlight[tuple[SuggestionResult, bool]] = SingleFlight()
+
+    def get_suggestions(self, profile_id: str, inputs: SuggestionInputs) -> tuple[SuggestionResult, bool]:
+        """Returns ``(result, cached)``; ``cached`` is False only for the
+        request that actually ran the generator."""
+        input_fingerprint = fingerprint(inputs)
+        entry = self._cache.get(profile_id, input_fingerprint)
+        if entry is not None:
+            return entry, True
+
+        def _generate() -> tuple[SuggestionResult, bool]:
+            hit = self._cache.get(profile_id, input_fingerprint)
+            if hit is not None:
+                return hit, True
+            suggestions = self._generator.generate(inputs)
+            return self._cache.put(profile_id, input_fingerprint, suggestions), False
+
+        (entry, cached), shared = self._flight.do((profile_id, input_fingerprint), _generate)
+        return entry, cached or shared
+
+
+_suggestion_service: SuggestionService | None = None
+
+
+def get_suggestion_service() -> SuggestionService:
+    global _suggestion_service
+    if _suggestion_service is None:
+        settings = get_settings()
+        factory = _generators.get(settings.suggestions_generator)
+        if factory is None:
+            raise RuntimeError(f"Unsupported SUGGESTIONS_GENERATOR: {settings.suggestions_generator}")
+        _suggestion_service = SuggestionService(
+            factory(),
+            SuggestionCache(settings.suggestions_ttl_seconds, settings.suggestions_cache_size),
+        )
+    return _suggestion_service
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import base64
+import binascii
+from typing import Any, Callable, Protocol
+
+from ..config import get_settings
+
+
+KEY_BYTES = 32
+IV_BYTES = 16
+
+
+class DecryptionError(Exception):
+    """The blob cannot be decrypted; retrying will not help."""
+
+
+class FileKeyProvider(Protocol):
+    def key_for(self, file: dict[str, Any]) -> bytes | None:
+        """Returns the AES-256 key for a medical_file row, or None if unavailable."""
+        ...
+
+
+class EnvFileKeyProvider:
+    """One key for every file, from FILE_ENCRYPTION_KEY (base64, 32 bytes)."""
+
+    def __init__(self) -> None:
+        encoded = get_settings().file_encryption_key
+        self._key = _decode(encoded, KEY_BYTES, "FILE_ENCRYPTION_KEY") if encoded else None
+
+    def key_for(self, file: dict[str, Any]) -> bytes | None:
+        return self._key
+
+
+_key_providers: dict[str, Callable[[], FileKeyProvider]] = {
+    "env": EnvFileKeyProvider,
+}
+
+
+def register_key_provider(name: str, factory: Callable[[], FileKeyProvider]) -> None:
+    _key_providers[name] = factory
+
+
+def get_key_provider() -> FileKeyProvider:
+    settings = get_settings()
+    factory = _key_providers.get(settings.file_key_provider)
+    if factory is None:
+        raise RuntimeError(f"Unsupported FILE_KEY_PROVIDER: {settings.file_key_provider}")
+    return factory()
+
+
+def _decode(value: str, size: int, name: str) -> bytes:
+    try:
+        raw = base64.b64decode(value, validate=True)
+    except (binascii.Error, ValueError) as exc:
+        raise DecryptionError(f"{name} is not valid base64") from exc
+    if len(raw) != size:
+        raise DecryptionError(f"{name} must decode to {size} bytes, got {len(raw)}")
+    return raw
+
+
+def decrypt_file(ciphertext: bytes, iv_b64: str | None, key: bytes) -> bytes:
+    """AES-256-CBC with PKCS7 padding, as written by the mobile client."""
+    try:
+        from cryptography.hazmat.primitives import padding
+        from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+    except ImportError as exc:
+        raise RuntimeError("File decryption requires the cryptography package") from exc
+
+    if not iv_b64:
+        raise DecryptionError("File has no encryption_iv")
+    iv = _decode(iv_b64, IV_BYTES, "encryption_iv")
+    if len(key) != KEY_BYTES:
+        raise DecryptionError(f"Key must be {KEY_BYTES} bytes")
+    if not ciphertext or len(ciphertext) % IV_BYTES:
+        raise DecryptionError("Ciphertext length is not a multiple of the block size")
+
+    decryptor = Cipher(algorithms.AES(key), modes.CBC(iv)).decryptor()
+    padded = decryptor.update(ciphertext) + decryptor.finalize()
+    unpadder = padding.PKCS7(algorithms.AES.block_size).unpadder()
+    try:
+        return unpadder.update(padded) + unpadder.finalize()
+    except ValueError as exc:
+        raise DecryptionError("Bad padding (wrong key or IV)") from exc
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from typing import Any
+
+from ..data_provider import get_data_provider
+from ..utils.push import send_expo_push
+from .telemetry_alerts import Alert
+
+
+_ALERT_TEXT = {
+    "low": "{metric} reading {value:.4g}{unit} is below {threshold:g}{unit}",
+    "high": "{metric} reading {value:.4g}{unit} is above {threshold:g}{unit}",
+    "window_change": (
+        "{metric} changed by {observed:.4g}{unit} within a day (limit {threshold:g}{unit})"
+    ),
+    "ewma_deviation": (
+        "{metric} reading {value:.4g}{unit} differs from the recent trend by {observed:.4g}{unit}"
+    ),
+}
+
+
+def _alert_message(alert: Alert) -> str:
+    metric = alert.metric_type.replace("_", " ")
+    return _ALERT_TEXT[alert.kind].format(
+        metric=metric,
+        value=alert.value,
+        threshold=alert.threshold,
+        observed=alert.observed,
+        unit=f" {alert.unit}" if alert.unit and alert.unit != "%" else alert.unit,
+    )
+
+
+def send_telemetry_alerts(alerts: list[Alert]) -> int:
+    """Pushes alerts to every linked account with telemetry_alert enabled.
+
+    Returns the number of push messages sent.
+    """
+    by_profile: dict[str, list[Alert]] = {}
+    for alert in alerts:
+        by_profile.setdefault(alert.profile_id, []).append(alert)
+
+    provider = get_data_provider()
+    messages: list[dict[str, Any]] = []
+    for profile_id, profile_alerts in by_profile.items():
+        for recipient in provider.list_alert_recipients(profile_id):
+            prefs = recipient.get("notif_prefs") or {}
+            token = recipient.get("expo_push_token")
+            if not token or not prefs.get("telemetry_alert", True):
+                continue
+            for alert in profile_alerts:
+                messages.append(
+                    {
+                        "to": token,
+                        "title": "Health reading alert",
+                        "body": _alert_message(alert),
+                        "data": {
+                            "type": "telemetry_alert",
+                            "profile_id": alert.profile_id,
+                            "metric_type": alert.metric_type,
+                            "kind": alert.kind,
+                        },
+                    }
+                )
+
+    send_expo_push(messages)
+    return len(messages)
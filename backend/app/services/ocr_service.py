@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Callable, Protocol
+
+from ..config import get_settings
+
+
+class OcrEngine(Protocol):
+    def extract_text(self, data: bytes, mime_type: str) -> str:
+        """data is the decrypted file; the worker never passes ciphertext."""
+        ...
+
+
+class StubOcrEngine:
+    """Deterministic stand-in for the real OCR model (local dev + tests)."""
+
+    def extract_text(self, data: bytes, mime_type: str) -> str:
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        return f"[stub ocr] {mime_type} {len(data)} bytes sha256:{digest}"
+
+
+_engines: dict[str, Callable[[], OcrEngine]] = {
+    "stub": StubOcrEngine,
+}
+
+
+def register_ocr_engine(name: str, factory: Callable[[], OcrEngine]) -> None:
+    _engines[name] = factory
+
+
+def get_ocr_engine() -> OcrEngine:
+    settings = get_settings()
+    factory = _engines.get(settings.ocr_engine)
+    if factory is None:
+        raise RuntimeError(f"Unsupported OCR_ENGINE: {settings.ocr_engine}")
+    return factory()
@@ -0,0 +1,210 @@
+"""In-memory inverted index mirroring search_medical_files() in 003.
+
+Used to benchmark relevance and latency offline (scripts/bench_search.py)
+without a Postgres instance. Behaviour follows the SQL function:
+
+- "fts": every query term must match (websearch_to_tsquery ANDs terms),
+  ranked by BM25 instead of ts_rank.
+- "trgm": used only when fts finds nothing; scores documents by the best
+  trigram overlap between the query and a word in the text.
+- Results ordered by (rank desc, file_id desc) with keyset pagination.
+
+Tokenisation is lowercase alphanumerics minus a small stopword list; there
+is no stemming, so "tablets" does not match "tablet" as it would in
+Postgres' english configuration.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+import math
+import re
+from typing import Collection
+
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the "
+    "to was were what when with my me i".split()
+)
+
+TRGM_THRESHOLD = 0.6
+SNIPPET_WORDS = 20
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def tokenize(text: str) -> list[str]:
+    return [token for token in _TOKEN_RE.findall(text.lower()) if token not in _STOPWORDS]
+
+
+def trigrams(word: str) -> set[str]:
+    padded = f"  {word} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass
+class IndexedDocument:
+    file_id: str
+    profile_id: str
+    text: str
+    length: int
+    words: frozenset[str]
+
+
+class InMemorySearchIndex:
+    def __init__(self) -> None:
+        self._docs: dict[str, IndexedDocument] = {}
+        self._postings: dict[str, dict[str, int]] = {}
+        self._trigram_words: dict[str, set[str]] = {}
+        self._word_docs: dict[str, set[str]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, file_id: str, profile_id: str, text: str) -> None:
+        if file_id in self._docs:
+            self.remove(file_id)
+
+        tokens = tokenize(text)
+        words = frozenset(_TOKEN_RE.findall(text.lower()))
+        self._docs[file_id] = IndexedDocument(file_id, profile_id, text, len(tokens), words)
+        self._total_length += len(tokens)
+
+        for term, count in Counter(tokens).items():
+            self._postings.setdefault(term, {})[file_id] = count
+        for word in words:
+            docs = self._word_docs.setdefault(word, set())
+            if not docs:
+                for gram in trigrams(word):
+                    self._trigram_words.setdefault(gram, set()).add(word)
+            docs.add(file_id)
+
+    def remove(self, file_id: str) -> None:
+        doc = self._docs.pop(file_id, None)
+        if doc is None:
+            return
+
+        self._total_length -= doc.length
+        for term in set(tokenize(doc.text)):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(file_id, None)
+                if not postings:
+                    del self._postings[term]
+        for word in doc.words:
+            docs = self._word_docs[word]
+            docs.discard(file_id)
+            if not docs:
+                del self._word_docs[word]
+                for gram in trigrams(word):
+                    grams = self._trigram_words[gram]
+                    grams.discard(word)
+                    if not grams:
+                        del self._trigram_words[gram]
+
+    def search(
+        self,
+        profile_ids: Collection[str],
+        query: str,
+        limit: int,
+        mode: str | None = None,
+        after: tuple[float, str] | None = None,
+    ) -> list[dict]:
+        allowed = set(profile_ids)
+        if mode is None or mode == "fts":
+            terms = tokenize(query)
+            hits = self._fts(terms, allowed)
+            if hits or mode == "fts":
+                return self._page("fts", hits, limit, after, terms)
+
+        words = _TOKEN_RE.findall(query.lower())
+        return self._page("trgm", self._trgm(words, allowed), limit, after, words)
+
+    def _fts(self, terms: list[str], allowed: set[str]) -> dict[str, float]:
+        if not terms or not self._docs:
+            return {}
+
+        postings = [self._postings.get(term, {}) for term in set(terms)]
+        postings.sort(key=len)
+        candidates = [doc_id for doc_id in postings[0] if all(doc_id in p for p in postings[1:])]
+
+        n_docs = len(self._docs)
+        avg_length = self._total_length / n_docs or 1.0
+        scores: dict[str, float] = {}
+        for doc_id in candidates:
+            doc = self._docs[doc_id]
+            if doc.profile_id not in allowed:
+                continue
+            score = 0.0
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * doc.length / avg_length)
+            for term_postings in postings:
+                tf = term_postings[doc_id]
+                idf = math.log(1 + (n_docs - len(term_postings) + 0.5) / (len(term_postings) + 0.5))
+                score += idf * tf * (BM25_K1 + 1) / (tf + norm)
+            scores[doc_id] = score
+        return scores
+
+    def _trgm(self, words: list[str], allowed: set[str]) -> dict[str, float]:
+        scores: dict[str, float] = {}
+        for query_word in words:
+            query_grams = trigrams(query_word)
+            overlap: Counter[str] = Counter()
+            for gram in query_grams:
+                overlap.update(self._trigram_words.get(gram, ()))
+
+            for word, shared in overlap.items():
+                similarity = shared / len(query_grams)
+                if similarity < TRGM_THRESHOLD:
+                    continue
+                for doc_id in self._word_docs[word]:
+                    if self._docs[doc_id].profile_id not in allowed:
+                        continue
+                    if similarity > scores.get(doc_id, 0.0):
+                        scores[doc_id] = similarity
+        return scores
+
+    def _page(
+        self,
+        mode: str,
+        scores: dict[str, float],
+        limit: int,
+        after: tuple[float, str] | None,
+        highlight: list[str],
+    ) -> list[dict]:
+        ranked = sorted(scores.items(), key=lambda item: (item[1], item[0]), reverse=True)
+        if after is not None:
+            ranked = [item for item in ranked if (item[1], item[0]) < after]
+
+        rows: list[dict] = []
+        for doc_id, rank in ranked[:limit]:
+            doc = self._docs[doc_id]
+            rows.append(
+                {
+                    "mode": mode,
+                    "file_id": doc_id,
+                    "profile_id": doc.profile_id,
+                    "rank": rank,
+                    "snippet": _snippet(doc.text, highlight),
+                }
+            )
+        return rows
+
+
+def _snippet(text: str, highlight: list[str]) -> str:
+    words = text.split()
+    targets = set(highlight)
+    start = 0
+    for index, word in enumerate(words):
+        if set(_TOKEN_RE.findall(word.lower())) & targets:
+            start = max(index - SNIPPET_WORDS // 4, 0)
+            break
+
+    fragment = []
+    for word in words[start : start + SNIPPET_WORDS]:
+        if set(_TOKEN_RE.findall(word.lower())) & targets:
+            word = f"**{word}**"
+        fragment.append(word)
+    return " ".join(fragment)
@@ -0,0 +1,281 @@
+"""Incremental threshold alerts for telemetry readings.
+
+State is kept in memory per (profile_id, metric_type): last value, an
+EWMA, and monotonic deques giving the min/max over a sliding time window.
+Each reading updates that state and is checked against the metric's rules
+in amortised O(1), so ingest never rescans history.
+
+Notes:
+- State is per process and starts empty; windowed and EWMA rules need a
+  few readings on a key before they can fire.
+- A reading older than the latest one seen for its key (a backdated
+  manual entry) is checked against the absolute low/high limits only and
+  does not move the rolling state.
+- Limits are in the units documented in 001_initial.sql (mmHg, mg/dL, %,
+  bpm, kg, C). ``unit`` is free text on ingest, so readings are converted
+  with ``canonical_value`` first; a unit it does not recognise for the
+  metric is skipped rather than compared against the wrong scale.
+- Memory is bounded: a key idle for longer than the window is dropped
+  (its window would be empty anyway), and past ALERT_STATE_MAX_KEYS the
+  least recently used key is evicted.
+- Under gunicorn (WEB_CONCURRENCY > 1) each worker has its own engine and
+  sees only the readings routed to it. Windowed and EWMA rules then see
+  part of a profile's stream and may miss a change, and cooldowns are per
+  worker, so one condition can alert once per worker. Absolute low/high
+  checks are unaffected apart from those duplicates.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+import threading
+import time
+from typing import Callable, Iterable
+
+from ..config import get_settings
+
+
+DEFAULT_WINDOW_SECONDS = 24 * 3600.0
+DEFAULT_EWMA_ALPHA = 0.3
+DEFAULT_MAX_KEYS = 50_000
+EWMA_MIN_SAMPLES = 3
+
+
+# Unit the DEFAULT_RULES limits for each metric are written in.
+CANONICAL_UNITS: dict[str, str] = {
+    "spo2": "%",
+    "heart_rate": "bpm",
+    "bp_systolic": "mmHg",
+    "bp_diastolic": "mmHg",
+    "blood_glucose": "mg/dL",
+    "temperature": "C",
+    "respiratory_rate": "/min",
+    "weight": "kg",
+}
+
+# Accepted spellings (lowercase, no spaces or degree sign) -> factor or converter.
+_UNIT_CONVERSIONS: dict[str, dict[str, float | Callable[[float], float]]] = {
+    "spo2": {"%": 1.0},
+    "heart_rate": {"bpm": 1.0, "/min": 1.0, "beats/min": 1.0},
+    "bp_systolic": {"mmhg": 1.0, "kpa": 7.50062},
+    "bp_diastolic": {"mmhg": 1.0, "kpa": 7.50062},
+    "blood_glucose": {"mg/dl": 1.0, "mmol/l": 18.016},
+    "temperature": {
+        "c": 1.0,
+        "celsius": 1.0,
+        "f": lambda value: (value - 32.0) * 5.0 / 9.0,
+        "fahrenheit": lambda value: (value - 32.0) * 5.0 / 9.0,
+    },
+    "respiratory_rate": {"/min": 1.0, "breaths/min": 1.0, "bpm": 1.0, "rpm": 1.0},
+    "weight": {"kg": 1.0, "lb": 0.45359237, "lbs": 0.45359237},
+}
+
+
+def canonical_value(metric_type: str, value: float, unit: str | None) -> float | None:
+    """``value`` in CANONICAL_UNITS[metric_type], or None for an unknown unit."""
+    spelling = (unit or "").strip().lower().replace(" ", "").replace("\u00b0", "")
+    conversion = _UNIT_CONVERSIONS.get(metric_type, {}).get(spelling)
+    if conversion is None:
+        return None
+    return conversion(value) if callable(conversion) else value * conversion
+
+
+@dataclass(frozen=True)
+class ThresholdRule:
+    metric_type: str
+    low: float | None = None
+    high: float | None = None
+    max_window_change: float | None = None
+    # alert when max - min within the window exceeds this
+    ewma_deviation: float | None = None
+    # alert when |value - ewma| exceeds this
+    cooldown_seconds: float = 3600.0
+
+
+DEFAULT_RULES: tuple[ThresholdRule, ...] = (
+    ThresholdRule("spo2", low=92),
+    ThresholdRule("heart_rate", low=40, high=130, ewma_deviation=30),
+    ThresholdRule("bp_systolic", low=90, high=180, max_window_change=40),
+    ThresholdRule("bp_diastolic", low=50, high=120),
+    ThresholdRule("blood_glucose", low=70, high=300, max_window_change=150),
+    ThresholdRule("temperature", low=35.0, high=39.0),
+    ThresholdRule("respiratory_rate", low=8, high=30),
+    ThresholdRule("weight", max_window_change=2.0),
+)
+
+
+@dataclass(frozen=True)
+class Reading:
+    profile_id: str
+    metric_type: str
+    value: float
+    recorded_at: float
+    # epoch seconds
+
+
+@dataclass(frozen=True)
+class Alert:
+    profile_id: str
+    metric_type: str
+    kind: str
+    # 'low' | 'high' | 'window_change' | 'ewma_deviation'
+    value: float
+    threshold: float
+    observed: float
+    recorded_at: float
+    unit: str = ""
+    # CANONICAL_UNITS[metric_type]; value and threshold are in this unit
+
+
+@dataclass
+class MetricState:
+    last_value: float | None = None
+    last_at: float = float("-inf")
+    ewma: float | None = None
+    samples: int = 0
+    window_min: deque[tuple[float, float]] = field(default_factory=deque)
+    window_max: deque[tuple[float, float]] = field(default_factory=deque)
+    last_alert_at: dict[str, float] = field(default_factory=dict)
+    touched_at: float = 0.0
+    # time.monotonic() of the last reading, for idle eviction
+
+    def push(self, recorded_at: float, value: float, window_seconds: float, alpha: float) -> None:
+        while self.window_min and self.window_min[-1][1] >= value:
+            self.window_min.pop()
+        self.window_min.append((recorded_at, value))
+        while self.window_max and self.window_max[-1][1] <= value:
+            self.window_max.pop()
+        self.window_max.append((recorded_at, value))
+
+        horizon = recorded_at - window_seconds
+        while self.window_min[0][0] < horizon:
+            self.window_min.popleft()
+        while self.window_max[0][0] < horizon:
+            self.window_max.popleft()
+
+        self.ewma = value if self.ewma is None else alpha * value + (1 - alpha) * self.ewma
+        self.samples += 1
+        self.last_value = value
+        self.last_at = recorded_at
+
+    def window_range(self) -> float:
+        return self.window_max[0][1] - self.window_min[0][1]
+
+
+class AlertEngine:
+    def __init__(
+        self,
+        rules: Iterable[ThresholdRule] = DEFAULT_RULES,
+        window_seconds: float = DEFAULT_WINDOW_SECONDS,
+        ewma_alpha: float = DEFAULT_EWMA_ALPHA,
+        max_keys: int = DEFAULT_MAX_KEYS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._rules: dict[str, list[ThresholdRule]] = {}
+        for rule in rules:
+            self._rules.setdefault(rule.metric_type, []).append(rule)
+        self._window_seconds = window_seconds
+        self._alpha = ewma_alpha
+        self._max_keys = max(max_keys, 1)
+        self._clock = clock
+        # Ordered by last reading, oldest first.
+        self._states: OrderedDict[tuple[str, str], MetricState] = OrderedDict()
+        self._lock = threading.Lock()
+        self.evicted = 0
+
+    def evaluate(self, reading: Reading) -> list[Alert]:
+        with self._lock:
+            alerts = self._evaluate(reading)
+            self._evict()
+            return alerts
+
+    def evaluate_batch(self, readings: Iterable[Reading]) -> list[Alert]:
+        """Evaluates a bulk ingest in time order per key under one lock."""
+        ordered = sorted(readings, key=lambda r: (r.profile_id, r.metric_type, r.recorded_at))
+        alerts: list[Alert] = []
+        with self._lock:
+            for reading in ordered:
+                alerts.extend(self._evaluate(reading))
+            self._evict()
+        return alerts
+
+    def state(self, profile_id: str, metric_type: str) -> MetricState | None:
+        return self._states.get((profile_id, metric_type))
+
+    def metrics(self) -> dict[str, int]:
+        with self._lock:
+            return {"keys": len(self._states), "evicted": self.evicted}
+
+    def _evict(self) -> None:
+        horizon = self._clock() - self._window_seconds
+        while self._states:
+            oldest_key, oldest = next(iter(self._states.items()))
+            if len(self._states) > self._max_keys:
+                self.evicted += 1
+            elif oldest.touched_at >= horizon:
+                break
+            del self._states[oldest_key]
+
+    def _evaluate(self, reading: Reading) -> list[Alert]:
+        rules = self._rules.get(reading.metric_type)
+        if not rules:
+            return []
+
+        key = (reading.profile_id, reading.metric_type)
+        state = self._states.pop(key, None)
+        if state is None:
+            state = MetricState()
+        state.touched_at = self._clock()
+        self._states[key] = state
+
+        value = reading.value
+        in_order = reading.recorded_at >= state.last_at
+        previous_ewma = state.ewma if state.samples >= EWMA_MIN_SAMPLES else None
+        if in_order:
+            state.push(reading.recorded_at, value, self._window_seconds, self._alpha)
+
+        alerts: list[Alert] = []
+        for rule in rules:
+            checks: list[tuple[str, float, float]] = []
+            if rule.low is not None and value < rule.low:
+                checks.append(("low", rule.low, value))
+            if rule.high is not None and value > rule.high:
+                checks.append(("high", rule.high, value))
+            if in_order and rule.max_window_change is not None:
+                change = state.window_range()
+                if change > rule.max_window_change:
+                    checks.append(("window_change", rule.max_window_change, change))
+            if in_order and rule.ewma_deviation is not None and previous_ewma is not None:
+                deviation = abs(value - previous_ewma)
+                if deviation > rule.ewma_deviation:
+                    checks.append(("ewma_deviation", rule.ewma_deviation, deviation))
+
+            for kind, threshold, observed in checks:
+                last_alert = state.last_alert_at.get(kind)
+                if last_alert is not None and reading.recorded_at - last_alert < rule.cooldown_seconds:
+                    continue
+                state.last_alert_at[kind] = reading.recorded_at
+                alerts.append(
+                    Alert(
+                        profile_id=reading.profile_id,
+                        metric_type=reading.metric_type,
+                        kind=kind,
+                        value=value,
+                        threshold=threshold,
+                        observed=observed,
+                        recorded_at=reading.recorded_at,
+                        unit=CANONICAL_UNITS.get(reading.metric_type, ""),
+                    )
+                )
+        return alerts
+
+
+_alert_engine: AlertEngine | None = None
+
+
+def get_alert_engine() -> AlertEngine:
+    global _alert_engine
+    if _alert_engine is None:
+        _alert_engine = AlertEngine(max_keys=get_settings().alert_state_max_keys)
+    return _alert_engine
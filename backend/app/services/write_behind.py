@@ -0,0 +1,164 @@
+"""Write-behind buffer for per-account settings.
+
+Push-token and notif_prefs writes are coalesced per account in memory
+(last write wins; notif_prefs patches merge shallowly) and flushed as one
+bulk statement every ``interval_seconds``, as soon as ``max_pending``
+accounts are waiting, and on shutdown. A failed flush puts its rows back
+under any newer writes and is retried on the next tick.
+
+Every buffered field carries the wall-clock time it was accepted
+(``written_at``). Buffers are per process and flush on independent
+timers, so with several workers two writes for one account can reach the
+database out of order; apply_account_settings (005) keeps the newest
+write per field, using those times.
+
+Buffers are per process: a write is visible to reads in the worker that
+accepted it until the flush lands. Rows handed to a flush stay readable
+through ``pending`` (as an in-flight layer under newer writes) until the
+flush commits or they are put back.
+"""
+
+from __future__ import annotations
+
+import copy
+import threading
+import time
+from typing import Any, Callable
+
+
+class AccountWriteBuffer:
+    def __init__(
+        self,
+        flush_rows: Callable[[list[dict[str, Any]]], None],
+        interval_seconds: float,
+        max_pending: int,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._flush_rows = flush_rows
+        self._clock = clock
+        self._interval = interval_seconds
+        self._max_pending = max(max_pending, 1)
+        self._pending: dict[str, dict[str, Any]] = {}
+        self._in_flight: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.writes = 0
+        self.coalesced = 0
+        self.flushes = 0
+        self.rows_flushed = 0
+        self.errors = 0
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="account-write-behind", daemon=True
+            )
+            self._thread.start()
+
+    def set_push_token(self, account_id: str, expo_push_token: str) -> None:
+        now = self._clock()
+        self._write(
+            account_id,
+            {"expo_push_token": expo_push_token, "written_at": {"expo_push_token": now}},
+        )
+
+    def merge_notif_prefs(self, account_id: str, updates: dict[str, Any]) -> None:
+        now = self._clock()
+        self._write(
+            account_id,
+            {
+                "notif_prefs": copy.deepcopy(updates),
+                "written_at": {f"notif_prefs.{key}": now for key in updates},
+            },
+        )
+
+    def pending(self, account_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._pending.get(account_id)
+            flushing = self._in_flight.get(account_id)
+            if flushing is not None:
+                entry = _merge(flushing, entry) if entry is not None else flushing
+            if entry is None:
+                return None
+            return {key: copy.deepcopy(value) for key, value in entry.items() if key != "written_at"}
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._in_flight = batch
+            if not batch:
+                return 0
+
+            rows = [{"id": account_id, **fields} for account_id, fields in batch.items()]
+            try:
+                self._flush_rows(rows)
+            except Exception as exc:
+                self.errors += 1
+                print(f"write-behind flush of {len(rows)} account(s) failed: {exc}")
+                with self._lock:
+                    for account_id, fields in batch.items():
+                        newer = self._pending.get(account_id)
+                        self._pending[account_id] = _merge(fields, newer) if newer else fields
+                    self._in_flight = {}
+                return 0
+
+            with self._lock:
+                self._in_flight = {}
+            self.flushes += 1
+            self.rows_flushed += len(rows)
+            return len(rows)
+
+    def close(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def metrics(self) -> dict[str, int]:
+        with self._lock:
+            pending = len(self._pending)
+            in_flight = len(self._in_flight)
+        return {
+            "writes": self.writes,
+            "coalesced": self.coalesced,
+            "flushes": self.flushes,
+            "rows_flushed": self.rows_flushed,
+            "errors": self.errors,
+            "pending": pending,
+            "in_flight": in_flight,
+        }
+
+    def _write(self, account_id: str, fields: dict[str, Any]) -> None:
+        with self._lock:
+            self.writes += 1
+            current = self._pending.get(account_id)
+            if current is None:
+                self._pending[account_id] = fields
+            else:
+                self.coalesced += 1
+                self._pending[account_id] = _merge(current, fields)
+            full = len(self._pending) >= self._max_pending
+        if full:
+            self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self._interval)
+            self._wake.clear()
+            self.flush()
+
+
+def _merge(older: dict[str, Any], newer: dict[str, Any]) -> dict[str, Any]:
+    merged = dict(older)
+    for key, value in newer.items():
+        if key in ("notif_prefs", "written_at") and key in merged:
+            merged[key] = {**merged[key], **value}
+        else:
+            merged[key] = value
+    return merged
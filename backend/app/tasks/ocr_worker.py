@@ -0,0 +1,208 @@
+"""OCR worker pool.
+
+Run from the backend directory:
+
+    python -m app.tasks.ocr_worker
+
+Starts OCR_WORKER_PROCESSES processes. Each process leases at most
+OCR_WORKER_CONCURRENCY jobs at a time from the ocr_job table and runs
+them on a thread pool, so a slow OCR call never blocks claiming.
+
+Blobs are stored encrypted. Each job is downloaded, decrypted with the
+key from FILE_KEY_PROVIDER and the file's encryption_iv, and checked
+against the client-supplied content hash before the OCR engine sees
+the plaintext. A file whose plaintext does not match its hash is
+rejected on its own, so a forged hash never reaches ocr_result.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+import hashlib
+import logging
+import multiprocessing
+import os
+import random
+import re
+import signal
+import socket
+from typing import Any, Callable
+
+from ..config import get_settings
+from ..data_provider import SupabaseProvider, get_data_provider
+from ..services.encryption_service import (
+    DecryptionError,
+    FileKeyProvider,
+    decrypt_file,
+    get_key_provider,
+)
+from ..services.ocr_service import OcrEngine, get_ocr_engine
+
+
+POLL_INTERVAL_SECONDS = 2.0
+LEASE_SECONDS = 600
+BACKOFF_BASE_SECONDS = 5.0
+BACKOFF_MAX_SECONDS = 600.0
+
+# Files confirmed without a hash are queued under their own id, which
+# nothing else can share, so only real SHA-256 values are verified.
+logger = logging.getLogger(__name__)
+
+_SHA256_HEX = re.compile(r"^[0-9a-f]{64}$")
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter, capped at BACKOFF_MAX_SECONDS."""
+    ceiling = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** max(attempts - 1, 0))
+    return random.uniform(ceiling / 2, ceiling)
+
+
+class OcrWorker:
+    def __init__(
+        self,
+        worker_id: str,
+        provider: SupabaseProvider,
+        engine: OcrEngine,
+        keys: FileKeyProvider,
+        concurrency: int,
+        poll_interval: float = POLL_INTERVAL_SECONDS,
+    ) -> None:
+        self.worker_id = worker_id
+        self._provider = provider
+        self._engine = engine
+        self._keys = keys
+        self._concurrency = max(concurrency, 1)
+        self._poll_interval = poll_interval
+
+    def run(self, stop: Any) -> None:
+        # stop: threading.Event or multiprocessing.Event
+        in_flight: set[Future] = set()
+        with ThreadPoolExecutor(
+            max_workers=self._concurrency, thread_name_prefix=self.worker_id
+        ) as pool:
+            while not stop.is_set():
+                free_slots = self._concurrency - len(in_flight)
+                jobs: list[dict] = []
+                if free_slots > 0:
+                    try:
+                        jobs = self._provider.claim_ocr_jobs(
+                            self.worker_id, free_slots, LEASE_SECONDS
+                        )
+                    except Exception as exc:
+                        logger.warning("[%s] claim failed: %s", self.worker_id, exc)
+
+                for job in jobs:
+                    future = pool.submit(self.process, job)
+                    future.add_done_callback(self._log_failure(job["id"]))
+                    in_flight.add(future)
+
+                if jobs and len(in_flight) < self._concurrency:
+                    # Queue may hold more ready jobs; claim again straight away.
+                    in_flight = {future for future in in_flight if not future.done()}
+                    continue
+
+                if in_flight:
+                    in_flight = wait(
+                        in_flight, timeout=self._poll_interval, return_when=FIRST_COMPLETED
+                    ).not_done
+                else:
+                    stop.wait(self._poll_interval)
+
+            wait(in_flight)
+
+    def _log_failure(self, job_id: str) -> Callable[[Future], None]:
+        # process() only raises when recording the outcome failed; the job
+        # then waits for its lease to expire and is claimed again.
+        def _callback(future: Future) -> None:
+            exc = future.exception()
+            if exc is not None:
+                logger.error(
+                    "[%s] job %s: could not record result", self.worker_id, job_id, exc_info=exc
+                )
+
+        return _callback
+
+    def process(self, job: dict) -> None:
+        job_id = job["id"]
+        try:
+            key = self._keys.key_for(job)
+            if key is None:
+                raise DecryptionError("No decryption key for file")
+            data = decrypt_file(
+                self._provider.download_file(job["storage_key"]), job["encryption_iv"], key
+            )
+        except DecryptionError as exc:
+            logger.warning("[%s] job %s cannot decrypt: %s", self.worker_id, job_id, exc)
+            self._provider.fail_ocr_job(job_id, str(exc), None)
+            return
+        except Exception as exc:
+            self._fail(job, exc)
+            return
+
+        claimed = job["content_sha256"]
+        if _SHA256_HEX.match(claimed) and hashlib.sha256(data).hexdigest() != claimed:
+            logger.warning(
+                "[%s] job %s file %s hash mismatch", self.worker_id, job_id, job["file_id"]
+            )
+            self._provider.reject_ocr_file(job_id, "Content does not match content_sha256")
+            return
+
+        try:
+            text = self._engine.extract_text(data, job["mime_type"])
+        except Exception as exc:
+            self._fail(job, exc)
+            return
+
+        # If this write fails the lease expires and another worker retries the job.
+        self._provider.complete_ocr_job(job_id, text)
+
+    def _fail(self, job: dict, exc: Exception) -> None:
+        attempts = int(job["attempts"])
+        retry_in = None if attempts >= int(job["max_attempts"]) else retry_delay(attempts)
+        logger.warning(
+            "[%s] job %s attempt %s failed: %s", self.worker_id, job["id"], attempts, exc
+        )
+        self._provider.fail_ocr_job(job["id"], str(exc) or type(exc).__name__, retry_in)
+
+
+def _worker_main(index: int, stop: Any) -> None:
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(processName)s %(message)s")
+    settings = get_settings()
+    worker = OcrWorker(
+        worker_id=f"{socket.gethostname()}:{os.getpid()}:{index}",
+        provider=get_data_provider(),
+        engine=get_ocr_engine(),
+        keys=get_key_provider(),
+        concurrency=settings.ocr_worker_concurrency,
+    )
+    worker.run(stop)
+
+
+def run_pool(processes: int) -> None:
+    stop = multiprocessing.Event()
+
+    def _shutdown(signum: int, frame: Any) -> None:
+        stop.set()
+
+    signal.signal(signal.SIGINT, _shutdown)
+    signal.signal(signal.SIGTERM, _shutdown)
+
+    workers = [
+        multiprocessing.Process(target=_worker_main, args=(index, stop), name=f"ocr-{index}")
+        for index in range(max(processes, 1))
+    ]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+
+
+def main() -> int:
+    settings = get_settings()
+    run_pool(settings.ocr_worker_processes)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
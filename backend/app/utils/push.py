@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from typing import Any
+
+import httpx
+
+
+EXPO_PUSH_URL = "https://exp.host/--/api/v2/push/send"
+EXPO_BATCH_SIZE = 100
+
+
+def send_expo_push(messages: list[dict[str, Any]]) -> None:
+    """Sends push messages through Expo, at most 100 per request."""
+    for start in range(0, len(messages), EXPO_BATCH_SIZE):
+        response = httpx.post(
+            EXPO_PUSH_URL,
+            json=messages[start : start + EXPO_BATCH_SIZE],
+            timeout=10.0,
+        )
+        response.raise_for_status()
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+import hashlib
+import threading
+import time
+from typing import Callable, Protocol
+
+from ..config import get_settings
+
+
+class RateLimiter(Protocol):
+    def hit(self, key: str) -> float:
+        """Consumes one token; returns 0.0 if allowed, else seconds to wait."""
+        ...
+
+    def metrics(self) -> dict[str, int]:
+        ...
+
+
+class TokenBucketLimiter:
+    """In-process token bucket per key with bounded memory.
+
+    Buckets live in an OrderedDict ordered by last use. A bucket idle long
+    enough to refill completely carries no state, so it is dropped from the
+    front on each hit; past ``max_keys`` the least recently used bucket is
+    evicted even if not yet full.
+    """
+
+    def __init__(
+        self,
+        capacity: float,
+        refill_per_second: float,
+        max_keys: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._capacity = float(capacity)
+        self._rate = float(refill_per_second)
+        self._max_keys = max(max_keys, 1)
+        self._clock = clock
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.rejected = 0
+        self.evicted = 0
+
+    def hit(self, key: str) -> float:
+        with self._lock:
+            now = self._clock()
+            tokens, updated = self._buckets.pop(key, (self._capacity, now))
+            tokens = min(self._capacity, tokens + (now - updated) * self._rate)
+
+            if tokens >= 1.0:
+                tokens -= 1.0
+                retry_after = 0.0
+                self.allowed += 1
+            else:
+                retry_after = (1.0 - tokens) / self._rate
+                self.rejected += 1
+
+            self._buckets[key] = (tokens, now)
+            self._evict(now)
+            return retry_after
+
+    def _evict(self, now: float) -> None:
+        while self._buckets:
+            oldest_key, (tokens, updated) = next(iter(self._buckets.items()))
+            if len(self._buckets) > self._max_keys:
+                self.evicted += 1
+            elif tokens + (now - updated) * self._rate < self._capacity:
+                break
+            del self._buckets[oldest_key]
+
+    def metrics(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "allowed": self.allowed,
+                "rejected": self.rejected,
+                "evicted": self.evicted,
+                "keys": len(self._buckets),
+            }
+
+
+_REDIS_TOKEN_BUCKET = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - updated) * rate)
+local retry_after = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+else
+  retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(retry_after)
+"""
+
+
+class RedisTokenBucketLimiter:
+    """Token bucket shared by all workers through Redis.
+
+    Keys are hashed so identifiers (emails, phone numbers) are not stored
+    in Redis in clear. If Redis is unreachable the hit is decided by a
+    per-process fallback limiter instead of failing the login.
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        prefix: str,
+        capacity: float,
+        refill_per_second: float,
+        fallback: TokenBucketLimiter,
+    ) -> None:
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("LOGIN_THROTTLE_BACKEND=redis requires the redis package") from exc
+
+        self._client = redis.Redis.from_url(redis_url, socket_timeout=0.05)
+        self._script = self._client.register_script(_REDIS_TOKEN_BUCKET)
+        self._prefix = prefix
+        self._capacity = capacity
+        self._rate = refill_per_second
+        self._fallback = fallback
+        self.allowed = 0
+        self.rejected = 0
+        self.backend_errors = 0
+
+    def hit(self, key: str) -> float:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        try:
+            result = self._script(keys=[self._prefix + digest], args=[self._capacity, self._rate])
+        except Exception:
+            self.backend_errors += 1
+            return self._fallback.hit(key)
+
+        retry_after = float(result)
+        if retry_after > 0:
+            self.rejected += 1
+        else:
+            self.allowed += 1
+        return retry_after
+
+    def metrics(self) -> dict[str, int]:
+        fallback = self._fallback.metrics()
+        return {
+            "allowed": self.allowed + fallback["allowed"],
+            "rejected": self.rejected + fallback["rejected"],
+            "evicted": fallback["evicted"],
+            "keys": fallback["keys"],
+            "backend_errors": self.backend_errors,
+        }
+
+
+class LoginThrottle:
+    """Limits login attempts per client IP and per identifier.
+
+    Buckets are checked in order and later ones are only charged when the
+    earlier ones allow the attempt:
+
+    1. per client IP;
+    2. per (identifier, client IP): the strict limit, so one source
+       guessing at an account only exhausts its own bucket;
+    3. per identifier across all sources: a looser cap on distributed
+       guessing. It should refill faster than one IP's limit so a single
+       source cannot lock the account's owner out.
+    """
+
+    def __init__(
+        self, by_identifier_ip: RateLimiter, by_identifier: RateLimiter, by_ip: RateLimiter
+    ) -> None:
+        self._by_identifier_ip = by_identifier_ip
+        self._by_identifier = by_identifier
+        self._by_ip = by_ip
+
+    def check(self, identifier: str, client_ip: str | None) -> float:
+        key = identifier.strip().lower()
+        if client_ip:
+            retry_after = self._by_ip.hit(client_ip)
+            if retry_after > 0:
+                return retry_after
+        retry_after = self._by_identifier_ip.hit(f"{key}|{client_ip or ''}")
+        if retry_after > 0:
+            return retry_after
+        return self._by_identifier.hit(key)
+
+    def metrics(self) -> dict[str, dict[str, int]]:
+        return {
+            "identifier_ip": self._by_identifier_ip.metrics(),
+            "identifier": self._by_identifier.metrics(),
+            "ip": self._by_ip.metrics(),
+        }
+
+
+_login_throttle: LoginThrottle | None = None
+
+
+def get_login_throttle() -> LoginThrottle:
+    global _login_throttle
+    if _login_throttle is None:
+        settings = get_settings()
+        limits = {
+            "identifier_ip": (settings.login_identifier_burst, settings.login_identifier_per_minute),
+            "identifier": (
+                settings.login_identifier_global_burst,
+                settings.login_identifier_global_per_minute,
+            ),
+            "ip": (settings.login_ip_burst, settings.login_ip_per_minute),
+        }
+        limiters: dict[str, RateLimiter] = {}
+        for name, (burst, per_minute) in limits.items():
+            local = TokenBucketLimiter(burst, per_minute / 60.0, settings.login_throttle_max_keys)
+            if settings.login_throttle_backend == "memory":
+                limiters[name] = local
+            elif settings.login_throttle_backend == "redis":
+                if not settings.redis_url:
+                    raise RuntimeError("Missing required env var: REDIS_URL")
+                limiters[name] = RedisTokenBucketLimiter(
+                    settings.redis_url, f"medinodus:login:{name}:", burst, per_minute / 60.0, local
+                )
+            else:
+                raise RuntimeError(
+                    f"Unsupported LOGIN_THROTTLE_BACKEND: {settings.login_throttle_backend}"
+                )
+        _login_throttle = LoginThrottle(
+            limiters["identifier_ip"], limiters["identifier"], limiters["ip"]
+        )
+    return _login_throttle
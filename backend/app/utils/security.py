@@ -8,6 +8,8 @@ from fastapi import Depends, Header, HTTPException, status
 from jose import JWTError, jwk, jwt
 
 from ..config import get_settings
+from .shared_cache import get_shared_cache
+from .singleflight import SingleFlight
 security_scheme = HTTPBearer()
 
 def _extract_bearer_token(authorization: str | None) -> str:
@@ -21,27 +23,65 @@ def _extract_bearer_token(authorization: str | None) -> str:
     return parts[1]
 
 
+JWKS_TTL_SECONDS = 300
+
 _jwks_cache: dict[str, object] = {"keys": [], "expires_at": 0.0}
 
 
+_jwks_flight: SingleFlight[list[dict]] = SingleFlight()
+
+
 def _fetch_jwks(jwks_url: str) -> list[dict]:
+    # Requests arriving with an expired cache or an unknown kid share one fetch.
+    keys, _ = _jwks_flight.do(jwks_url, lambda: _download_jwks(jwks_url))
+    return keys
+
+
+def _download_jwks(jwks_url: str) -> list[dict]:
     response = httpx.get(jwks_url, timeout=10.0)
     response.raise_for_status()
     payload = response.json()
     return payload.get("keys", [])
 
 
+def jwks_fetch_stats() -> dict[str, int]:
+    return _jwks_flight.stats()
+
+
 def _get_jwks(settings) -> list[dict]:
     now = time.time()
     if _jwks_cache["keys"] and now < float(_jwks_cache["expires_at"]):
         return _jwks_cache["keys"]
 
+    shared = get_shared_cache()
+    if shared is not None:
+        # One worker per host fetches; the others pick up its result.
+        keys = shared.get_or_fill(
+            f"jwks:{settings.supabase_jwks_url}",
+            JWKS_TTL_SECONDS,
+            lambda: _fetch_jwks(settings.supabase_jwks_url),
+        )
+    else:
+        keys = _fetch_jwks(settings.supabase_jwks_url)
+    _jwks_cache["keys"] = keys
+    _jwks_cache["expires_at"] = now + JWKS_TTL_SECONDS
+    return keys
+
+
+def _refresh_jwks(settings) -> list[dict]:
     keys = _fetch_jwks(settings.supabase_jwks_url)
+    shared = get_shared_cache()
+    if shared is not None:
+        shared.set(f"jwks:{settings.supabase_jwks_url}", keys, JWKS_TTL_SECONDS)
     _jwks_cache["keys"] = keys
-    _jwks_cache["expires_at"] = now + 300
+    _jwks_cache["expires_at"] = time.time() + JWKS_TTL_SECONDS
     return keys
 
 
+def prefetch_jwks() -> None:
+    _get_jwks(get_settings())
+
+
 def _find_jwk(keys: list[dict], kid: str) -> dict | None:
     for key in keys:
         if key.get("kid") == kid:
@@ -60,9 +100,7 @@ def decode_jwt_token(token: str) -> dict:
     keys = _get_jwks(settings)
     jwk_data = _find_jwk(keys, kid)
     if not jwk_data:
-        keys = _fetch_jwks(settings.supabase_jwks_url)
-        _jwks_cache["keys"] = keys
-        _jwks_cache["expires_at"] = time.time() + 300
+        keys = _refresh_jwks(settings)
         jwk_data = _find_jwk(keys, kid)
 
     if not jwk_data:
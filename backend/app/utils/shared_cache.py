@@ -0,0 +1,154 @@
+"""Cache shared by all worker processes on one host.
+
+Entries are small JSON files in a tmpfs directory (``/dev/shm`` by
+default), written atomically with rename. ``get_or_fill`` takes an
+exclusive ``flock`` per key while filling, so when N workers miss at once
+one of them calls upstream and the rest read its result.
+
+/dev/shm is writable by every local user, so the directory is created
+0700 and refused unless it is owned by this process's user with no
+group or other permissions; otherwise another user could plant entries.
+Only public data (JWKS) is stored here, never authorization decisions.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import stat
+import tempfile
+import time
+from typing import Any, Callable
+
+from ..config import get_settings
+
+
+PRUNE_EVERY_WRITES = 256
+
+logger = logging.getLogger(__name__)
+
+
+class SharedFileCache:
+    def __init__(self, directory: str) -> None:
+        self._dir = Path(directory)
+        self._dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+        _check_private(self._dir)
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.fills = 0
+
+    def _path(self, key: str, suffix: str = ".json") -> Path:
+        return self._dir / (hashlib.sha256(key.encode("utf-8")).hexdigest()[:32] + suffix)
+
+    def get(self, key: str) -> Any | None:
+        try:
+            with open(self._path(key), encoding="utf-8") as handle:
+                entry = json.load(handle)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        if entry.get("key") != key or entry.get("expires_at", 0) <= time.time():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry.get("value")
+
+    def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        payload = json.dumps({"key": key, "expires_at": time.time() + ttl_seconds, "value": value})
+        fd, tmp_path = tempfile.mkstemp(dir=self._dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                handle.write(payload)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        self._writes += 1
+        if self._writes % PRUNE_EVERY_WRITES == 0:
+            self.prune()
+
+    def get_or_fill(self, key: str, ttl_seconds: float, fill: Callable[[], Any]) -> Any:
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with open(self._path(key, ".lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                value = self.get(key)
+                if value is not None:
+                    return value
+                value = fill()
+                self.fills += 1
+                self.set(key, value, ttl_seconds)
+                return value
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def delete(self, key: str) -> None:
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def prune(self) -> int:
+        """Removes expired entries; returns how many were removed."""
+        removed = 0
+        now = time.time()
+        for path in self._dir.glob("*.json"):
+            try:
+                with open(path, encoding="utf-8") as handle:
+                    expires_at = json.load(handle).get("expires_at", 0)
+                if expires_at <= now:
+                    path.unlink()
+                    removed += 1
+            except (OSError, ValueError):
+                continue
+        return removed
+
+    def metrics(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "fills": self.fills}
+
+
+def _check_private(directory: Path) -> None:
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode):
+        raise RuntimeError(f"Shared cache path {directory} is not a directory")
+    if info.st_uid != os.getuid():
+        raise RuntimeError(f"Shared cache directory {directory} is not owned by uid {os.getuid()}")
+    if info.st_mode & 0o077:
+        raise RuntimeError(
+            f"Shared cache directory {directory} has mode {stat.S_IMODE(info.st_mode):o}; "
+            "expected no group/other permissions (0700)"
+        )
+
+
+_shared_cache: SharedFileCache | None = None
+_shared_cache_refused = False
+
+
+def get_shared_cache() -> SharedFileCache | None:
+    """Returns the host-wide cache, or None when SHARED_CACHE_DIR is unset
+    or the directory fails the ownership/permission check."""
+    global _shared_cache, _shared_cache_refused
+    settings = get_settings()
+    if not settings.shared_cache_dir or _shared_cache_refused:
+        return None
+    if _shared_cache is None:
+        try:
+            _shared_cache = SharedFileCache(settings.shared_cache_dir)
+        except (OSError, RuntimeError) as exc:
+            # Fall back to per-process caching rather than trust the directory.
+            logger.error("Shared cache disabled: %s", exc)
+            _shared_cache_refused = True
+            return None
+    return _shared_cache
@@ -0,0 +1,56 @@
+"""Gunicorn settings for multi-worker serving.
+
+Run from the backend directory (gunicorn is not a core dependency):
+
+    pip install -e ".[serve]"     # from the repo root
+    WEB_CONCURRENCY=4 gunicorn -c gunicorn.conf.py app.main:app
+
+The app is imported once in the master (preload_app) and workers are
+forked from it, so module import and route building are paid once. Each
+worker then runs the app lifespan (app.main.warm_up) before accepting
+connections. SHARED_CACHE_DIR defaults to /dev/shm/medinodus here so JWKS
+is fetched once per host and shared between workers. Authorization checks
+are never cached there.
+
+Behind a load balancer, set FORWARDED_ALLOW_IPS to the balancer's
+addresses so X-Forwarded-For is trusted from them and request.client is
+the real client (login throttling keys on it). Without it every request
+appears to come from the balancer and the per-IP login limit becomes a
+global one. Never set it to "*" when the app port is reachable directly.
+"""
+
+import os
+
+from dotenv import load_dotenv
+
+# Before any os.getenv below, so WEB_CONCURRENCY/BIND/PORT in .env apply.
+load_dotenv()
+os.environ.setdefault("SHARED_CACHE_DIR", "/dev/shm/medinodus")
+
+try:
+    import uvicorn_worker  # noqa: F401
+
+    worker_class = "uvicorn_worker.UvicornWorker"
+except ImportError:
+    worker_class = "uvicorn.workers.UvicornWorker"
+
+bind = os.getenv("BIND", "0.0.0.0:" + os.getenv("PORT", "8000"))
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+preload_app = True
+graceful_timeout = 30
+timeout = 60
+keepalive = 5
+
+# Passed to UvicornWorker, which rewrites request.client from
+# X-Forwarded-For only for connections from these addresses.
+forwarded_allow_ips = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+
+def when_ready(server):
+    # Fill the shared JWKS entry once before any worker is forked.
+    from app.utils.security import prefetch_jwks
+
+    try:
+        prefetch_jwks()
+    except Exception as exc:
+        server.log.warning("JWKS prefetch failed: %s", exc)
@@ -0,0 +1,44 @@
+import os
+import time
+
+import pytest
+
+
+# get_settings() requires these; tests never reach Supabase.
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_PUBLISHABLE_KEY", "test-publishable-key")
+os.environ.setdefault("SUPABASE_SECRET_KEY", "test-secret-key")
+
+
+@pytest.fixture
+def wait_until():
+    """Spins until predicate() is true; fails the test instead of hanging."""
+
+    def _wait(predicate, timeout: float = 5.0) -> None:
+        deadline = time.monotonic() + timeout
+        while not predicate():
+            assert time.monotonic() < deadline, "condition not reached"
+            time.sleep(0.001)
+
+    return _wait
+
+
+class FakeClock:
+    """Manually advanced clock; call it, or use it where ``time`` is expected."""
+
+    def __init__(self, now: float = 0.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
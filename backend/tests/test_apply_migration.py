@@ -0,0 +1,136 @@
+from pathlib import Path
+
+import pytest
+
+from apply_migration import (
+    Migration,
+    _run_steps,
+    baseline_migrations,
+    concurrent_index_name,
+    discover_migrations,
+    pending_migrations,
+    split_statements,
+)
+
+
+def _migration(version: int, sql: str = "select 1;", transactional: bool = True) -> Migration:
+    return Migration(version, f"{version:03d}_m.sql", Path("."), sql, f"sum{version}", transactional)
+
+
+def test_split_keeps_dollar_quoted_bodies_whole():
+    sql = """
+    create function f() returns int language plpgsql as $$
+    begin
+      perform 1; return 2;
+    end;
+    $$;
+    create function g() returns text language sql as $body$ select 'a;b' $body$;
+    """
+    statements = split_statements(sql)
+    assert len(statements) == 2
+    assert statements[0].startswith("create function f()") and statements[0].endswith("$$;")
+    assert "select 'a;b'" in statements[1]
+
+
+def test_split_handles_doubled_quotes_and_comments():
+    sql = (
+        "-- leading; comment\n"
+        "insert into t values ('it''s; fine');\n"
+        "/* block; comment */ update \"we\"\"ird;\" set x = 1; -- trailing;\n"
+        ";;\n"
+    )
+    assert split_statements(sql) == [
+        "-- leading; comment\ninsert into t values ('it''s; fine');",
+        '/* block; comment */ update "we""ird;" set x = 1;',
+    ]
+
+
+def test_split_keeps_unterminated_last_statement():
+    assert split_statements("select 1; select 2") == ["select 1;", "select 2"]
+
+
+def test_concurrent_index_name():
+    assert (
+        concurrent_index_name("-- note\ncreate index concurrently if not exists idx_a\n on t(a);")
+        == "idx_a"
+    )
+    assert concurrent_index_name("CREATE UNIQUE INDEX CONCURRENTLY public.idx_b ON t(b);") == "public.idx_b"
+    assert concurrent_index_name("create index idx_c on t(c);") is None
+    assert concurrent_index_name("-- create index concurrently idx_d on t(d);\nselect 1;") is None
+
+
+def test_pending_skips_applied_and_respects_target():
+    migrations = [_migration(v) for v in (1, 2, 3, 4)]
+    applied = {1: "sum1", 3: "sum3"}
+
+    assert [m.version for m in pending_migrations(migrations, applied)] == [2, 4]
+    assert [m.version for m in pending_migrations(migrations, applied, target=3)] == [2]
+    assert pending_migrations(migrations, {v: "" for v in (1, 2, 3, 4)}) == []
+
+
+def test_baseline_marks_only_unapplied_up_to_version():
+    migrations = [_migration(v) for v in (1, 2, 3)]
+    assert [m.version for m in baseline_migrations(migrations, {}, 2)] == [1, 2]
+    assert [m.version for m in baseline_migrations(migrations, {1: "sum1"}, 2)] == [2]
+
+
+def test_discover_orders_and_detects_marker(tmp_path):
+    (tmp_path / "002_b.sql").write_text("-- migrate:no-transaction\nselect 1;")
+    (tmp_path / "001_a.sql").write_text("select 1;")
+    (tmp_path / "notes.sql").write_text("select 1;")
+
+    migrations = discover_migrations(tmp_path)
+    assert [(m.version, m.transactional) for m in migrations] == [(1, True), (2, False)]
+
+    (tmp_path / "002_c.sql").write_text("select 1;")
+    with pytest.raises(RuntimeError, match="Duplicate"):
+        discover_migrations(tmp_path)
+
+
+class FakeCursor:
+    """Records statements; pg_index lookups answer from ``indexes``."""
+
+    def __init__(self, indexes: dict[str, bool], built_valid: bool = True) -> None:
+        self.indexes = indexes
+        self.built_valid = built_valid
+        self.executed: list[str] = []
+        self._row = None
+
+    def execute(self, statement: str, params=None) -> None:
+        if "from pg_index" in statement:
+            name = params[0]
+            self._row = (self.indexes[name],) if name in self.indexes else None
+            return
+        self.executed.append(statement)
+        name = concurrent_index_name(statement)
+        if name and name not in self.indexes:
+            self.indexes[name] = self.built_valid
+        if statement.startswith("drop index concurrently if exists "):
+            self.indexes.pop(statement.rsplit(" ", 1)[1].rstrip(";"), None)
+
+    def fetchone(self):
+        return self._row
+
+
+SQL_004 = (
+    "-- migrate:no-transaction\n"
+    "create index concurrently if not exists idx_new on t(a, b);\n"
+    "drop index concurrently if exists idx_old;\n"
+)
+
+
+def test_invalid_leftover_is_dropped_before_rebuild():
+    cur = FakeCursor({"idx_new": False, "idx_old": True})
+    _run_steps(cur, _migration(4, SQL_004, transactional=False))
+
+    assert cur.executed[0] == "drop index concurrently if exists idx_new"
+    assert cur.indexes == {"idx_new": True}
+
+
+def test_invalid_build_stops_before_old_index_is_dropped():
+    cur = FakeCursor({"idx_old": True}, built_valid=False)
+    with pytest.raises(RuntimeError, match="INVALID"):
+        _run_steps(cur, _migration(4, SQL_004, transactional=False))
+
+    assert "idx_old" in cur.indexes
+    assert not any("idx_old" in statement for statement in cur.executed)
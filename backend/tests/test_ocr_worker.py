@@ -0,0 +1,177 @@
+import base64
+from concurrent.futures import Future
+import hashlib
+import logging
+import os
+
+from cryptography.hazmat.primitives import padding
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+import pytest
+
+from app.services.encryption_service import DecryptionError, decrypt_file
+from app.tasks.ocr_worker import OcrWorker
+
+
+KEY = bytes(range(32))
+PLAINTEXT = b"HbA1c 6.1% fasting glucose 98 mg/dL"
+
+
+def _encrypt(data: bytes, key: bytes = KEY) -> tuple[bytes, str]:
+    iv = os.urandom(16)
+    padder = padding.PKCS7(128).padder()
+    padded = padder.update(data) + padder.finalize()
+    encryptor = Cipher(algorithms.AES(key), modes.CBC(iv)).encryptor()
+    return encryptor.update(padded) + encryptor.finalize(), base64.b64encode(iv).decode()
+
+
+class FakeProvider:
+    def __init__(self, blob: bytes = b"", download_error: Exception | None = None) -> None:
+        self.blob = blob
+        self.download_error = download_error
+        self.calls: list[tuple] = []
+
+    def download_file(self, storage_key: str) -> bytes:
+        if self.download_error is not None:
+            raise self.download_error
+        return self.blob
+
+    def complete_ocr_job(self, job_id, text):
+        self.calls.append(("complete", job_id, text))
+
+    def fail_ocr_job(self, job_id, error, retry_in_seconds):
+        self.calls.append(("fail", job_id, error, retry_in_seconds))
+
+    def reject_ocr_file(self, job_id, error):
+        self.calls.append(("reject", job_id, error))
+
+
+class FixedKey:
+    def __init__(self, key: bytes | None) -> None:
+        self.key = key
+
+    def key_for(self, file):
+        return self.key
+
+
+class EchoEngine:
+    def __init__(self) -> None:
+        self.seen: list[bytes] = []
+
+    def extract_text(self, data: bytes, mime_type: str) -> str:
+        self.seen.append(data)
+        return data.decode()
+
+
+def _job(iv: str, content_sha256: str, attempts: int = 1) -> dict:
+    return {
+        "id": "job-1",
+        "file_id": "file-1",
+        "storage_key": "acct/file-1",
+        "mime_type": "image/png",
+        "encryption_iv": iv,
+        "content_sha256": content_sha256,
+        "attempts": attempts,
+        "max_attempts": 5,
+    }
+
+
+def _run(provider, job, key=KEY) -> EchoEngine:
+    engine = EchoEngine()
+    OcrWorker("w", provider, engine, FixedKey(key), concurrency=1).process(job)
+    return engine
+
+
+def test_decrypt_round_trip():
+    blob, iv = _encrypt(PLAINTEXT)
+    assert decrypt_file(blob, iv, KEY) == PLAINTEXT
+
+
+@pytest.mark.parametrize(
+    "blob, iv, key, message",
+    [
+        (b"x" * 16, None, KEY, "no encryption_iv"),
+        (b"x" * 16, "not base64!", KEY, "not valid base64"),
+        (b"x" * 16, base64.b64encode(b"short").decode(), KEY, "16 bytes"),
+        (b"x" * 15, base64.b64encode(bytes(16)).decode(), KEY, "block size"),
+        (b"x" * 16, base64.b64encode(bytes(16)).decode(), b"short", "32 bytes"),
+    ],
+)
+def test_decrypt_rejects_malformed_input(blob, iv, key, message):
+    with pytest.raises(DecryptionError, match=message):
+        decrypt_file(blob, iv, key)
+
+
+def test_decrypt_with_wrong_key_fails():
+    blob, iv = _encrypt(PLAINTEXT)
+    wrong = bytes(reversed(KEY))
+    try:
+        result = decrypt_file(blob, iv, wrong)
+    except DecryptionError:
+        return
+    # Wrong keys occasionally yield valid padding; the content still differs.
+    assert result != PLAINTEXT
+
+
+def test_verified_plaintext_reaches_engine_and_completes():
+    blob, iv = _encrypt(PLAINTEXT)
+    provider = FakeProvider(blob)
+    engine = _run(provider, _job(iv, hashlib.sha256(PLAINTEXT).hexdigest()))
+
+    assert engine.seen == [PLAINTEXT]
+    assert provider.calls == [("complete", "job-1", PLAINTEXT.decode())]
+
+
+def test_hash_mismatch_rejects_file_without_ocr():
+    blob, iv = _encrypt(PLAINTEXT)
+    provider = FakeProvider(blob)
+    engine = _run(provider, _job(iv, hashlib.sha256(b"someone else's scan").hexdigest()))
+
+    assert engine.seen == []
+    assert [call[0] for call in provider.calls] == ["reject"]
+
+
+def test_file_id_keyed_jobs_are_not_hash_checked():
+    blob, iv = _encrypt(PLAINTEXT)
+    provider = FakeProvider(blob)
+    _run(provider, _job(iv, "6f1c2a9e-1111-4222-8333-444455556666"))
+
+    assert [call[0] for call in provider.calls] == ["complete"]
+
+
+def test_decrypt_error_fails_job_without_retry():
+    blob, _ = _encrypt(PLAINTEXT)
+    provider = FakeProvider(blob)
+    _run(provider, _job(None, hashlib.sha256(PLAINTEXT).hexdigest()))
+
+    assert provider.calls == [("fail", "job-1", "File has no encryption_iv", None)]
+
+
+def test_missing_key_fails_job_without_retry():
+    blob, iv = _encrypt(PLAINTEXT)
+    provider = FakeProvider(blob)
+    engine = _run(provider, _job(iv, hashlib.sha256(PLAINTEXT).hexdigest()), key=None)
+
+    assert engine.seen == []
+    assert provider.calls == [("fail", "job-1", "No decryption key for file", None)]
+
+
+def test_download_error_is_retried_until_last_attempt():
+    provider = FakeProvider(download_error=ConnectionError("storage timeout"))
+    _run(provider, _job("iv", "x", attempts=2))
+    _run(provider, _job("iv", "x", attempts=5))
+
+    (_, _, _, first_retry), (_, _, _, last_retry) = provider.calls
+    assert first_retry is not None and first_retry > 0
+    assert last_retry is None
+
+
+def test_errors_recording_the_outcome_are_logged(caplog):
+    worker = OcrWorker("w", FakeProvider(), EchoEngine(), FixedKey(KEY), concurrency=1)
+    future: Future = Future()
+    future.set_exception(RuntimeError("rpc down"))
+
+    with caplog.at_level(logging.ERROR, logger="app.tasks.ocr_worker"):
+        worker._log_failure("job-1")(future)
+
+    assert "job job-1: could not record result" in caplog.text
+    assert "rpc down" in caplog.text
@@ -0,0 +1,66 @@
+from app.utils.rate_limit import LoginThrottle, TokenBucketLimiter
+
+
+def test_bucket_allows_burst_then_refills(clock):
+    limiter = TokenBucketLimiter(capacity=2, refill_per_second=1.0, max_keys=10, clock=clock)
+
+    assert limiter.hit("a") == 0.0
+    assert limiter.hit("a") == 0.0
+    assert limiter.hit("a") == 1.0
+    clock.advance(1.0)
+    assert limiter.hit("a") == 0.0
+    assert limiter.metrics()["rejected"] == 1
+
+
+def test_bucket_memory_is_bounded(clock):
+    limiter = TokenBucketLimiter(capacity=5, refill_per_second=0.1, max_keys=3, clock=clock)
+    for index in range(10):
+        limiter.hit(f"ip-{index}")
+
+    metrics = limiter.metrics()
+    assert metrics["keys"] == 3
+    assert metrics["evicted"] == 7
+
+
+def _throttle(clock) -> LoginThrottle:
+    return LoginThrottle(
+        TokenBucketLimiter(capacity=5, refill_per_second=5 / 60, max_keys=100, clock=clock),
+        TokenBucketLimiter(capacity=60, refill_per_second=1.0, max_keys=100, clock=clock),
+        TokenBucketLimiter(capacity=20, refill_per_second=0.5, max_keys=100, clock=clock),
+    )
+
+
+def test_throttle_keys_identifier_case_insensitively(clock):
+    throttle = _throttle(clock)
+    for _ in range(5):
+        assert throttle.check("User@Example.com", "10.0.0.1") == 0.0
+    assert throttle.check("user@example.com ", "10.0.0.1") > 0
+    assert throttle.check("other@example.com", "10.0.0.1") == 0.0
+
+
+def test_one_source_cannot_lock_out_the_account_owner(clock):
+    throttle = _throttle(clock)
+    for _ in range(10 * 60):
+        # Attacker keeps the victim's identifier saturated from one IP ...
+        throttle.check("victim@example.com", "203.0.113.9")
+        clock.advance(1.0)
+    # ... but the owner, from their own IP, still gets through.
+    assert throttle.check("victim@example.com", "198.51.100.7") == 0.0
+
+
+def test_distributed_guessing_hits_the_global_identifier_cap(clock):
+    throttle = _throttle(clock)
+    results = [throttle.check("victim@example.com", f"10.0.{i // 5}.{i % 5}") for i in range(61)]
+    assert results[:60] == [0.0] * 60
+    assert results[60] > 0
+    assert throttle.metrics()["identifier"]["rejected"] == 1
+
+
+def test_rejected_ip_does_not_charge_identifier_buckets(clock):
+    throttle = _throttle(clock)
+    for index in range(25):
+        throttle.check(f"user{index}@example.com", "203.0.113.9")
+
+    metrics = throttle.metrics()
+    assert metrics["ip"]["rejected"] == 5
+    assert metrics["identifier"]["allowed"] == 20
@@ -0,0 +1,61 @@
+import threading
+
+from fastapi.testclient import TestClient
+
+from app import main
+from app.data_provider import SupabaseProvider
+from app.utils.singleflight import SingleFlight
+
+
+class GatedProvider(SupabaseProvider):
+    """SupabaseProvider with the upstream profile read replaced."""
+
+    def __init__(self) -> None:
+        self._reads = SingleFlight()
+        self._writes = None
+        self.fetches = 0
+        self.gate = threading.Event()
+
+    def _fetch_profile_detail(self, profile_id):
+        self.fetches += 1
+        self.gate.wait(5)
+        return {"id": profile_id, "conditions": ["asthma"]}, [{"account_id": "a1"}]
+
+
+def test_concurrent_get_profile_shares_one_fetch_with_private_copies(wait_until):
+    provider = GatedProvider()
+    results: list[tuple[dict, list[dict]]] = []
+    lock = threading.Lock()
+
+    def read() -> None:
+        result = provider.get_profile("p1")
+        with lock:
+            results.append(result)
+
+    threads = [threading.Thread(target=read) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    wait_until(lambda: provider.read_coalescing_stats()["shared"] == 4)
+    provider.gate.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert provider.fetches == 1
+    assert len(results) == 5
+    profile, linked = results[0]
+    profile["conditions"].append("mutated")
+    linked.clear()
+    assert all(other[0]["conditions"] == ["asthma"] for other in results[1:])
+    assert all(other[1] == [{"account_id": "a1"}] for other in results[1:])
+    assert provider.read_coalescing_stats() == {"executed": 1, "shared": 4, "in_flight": 0}
+
+
+def test_health_reports_coalescing_counters(monkeypatch):
+    provider = GatedProvider()
+    monkeypatch.setattr(main, "get_data_provider", lambda: provider)
+
+    body = TestClient(main.create_app()).get("/health").json()
+
+    assert body["read_coalescing"] == {"executed": 0, "shared": 0, "in_flight": 0}
+    assert set(body["jwks_fetch"]) == {"executed", "shared", "in_flight"}
+    assert "identifier_ip" in body["login_throttle"]
@@ -0,0 +1,106 @@
+import base64
+import json
+import uuid
+
+from fastapi import HTTPException
+import pytest
+
+from app.routers.ai import _decode_cursor, _encode_cursor
+from app.services.search_index import InMemorySearchIndex
+
+
+def _cursor(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+
+def test_cursor_round_trip():
+    file_id = str(uuid.uuid4())
+    cursor = _encode_cursor({"mode": "trgm", "rank": 0.75, "file_id": file_id})
+    assert _decode_cursor(cursor) == ("trgm", 0.75, file_id)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not-base64!!",
+        _cursor({"mode": "fts"}),
+        _cursor(["bm25", 1.0, str(uuid.uuid4())]),
+        _cursor(["fts", "NaN", str(uuid.uuid4())]),
+        _cursor(["fts", float("inf"), str(uuid.uuid4())]),
+        _cursor(["fts", 1.0, "1; drop table medical_file"]),
+        _cursor(["fts", 1.0, 42]),
+        _cursor(["fts", None, str(uuid.uuid4())]),
+    ],
+)
+def test_malformed_cursor_is_400(cursor):
+    with pytest.raises(HTTPException) as exc_info:
+        _decode_cursor(cursor)
+    assert exc_info.value.status_code == 400
+
+
+@pytest.fixture
+def index() -> InMemorySearchIndex:
+    index = InMemorySearchIndex()
+    index.add("f1", "p1", "Discharge summary: metformin 500 mg twice daily for diabetes")
+    index.add("f2", "p1", "Lipid panel: cholesterol high, start atorvastatin")
+    index.add("f3", "p1", "Diabetes review, HbA1c improved, continue metformin")
+    index.add("f4", "p2", "Metformin prescription for diabetes")
+    return index
+
+
+def test_fts_requires_every_term(index):
+    rows = index.search(["p1"], "metformin diabetes", limit=10)
+    assert {row["file_id"] for row in rows} == {"f1", "f3"}
+    assert all(row["mode"] == "fts" for row in rows)
+
+    assert {row["file_id"] for row in index.search(["p1"], "metformin cholesterol", limit=10, mode="fts")} == set()
+
+
+def test_results_are_limited_to_allowed_profiles(index):
+    assert {row["file_id"] for row in index.search(["p2"], "metformin", limit=10)} == {"f4"}
+
+
+def test_falls_back_to_trigram_on_no_fts_hit(index):
+    rows = index.search(["p1"], "atorvastatn", limit=10)
+    assert [(row["mode"], row["file_id"]) for row in rows] == [("trgm", "f2")]
+    assert index.search(["p1"], "atorvastatn", limit=10, mode="fts") == []
+
+
+def test_keyset_paging_visits_every_hit_once(index):
+    seen: list[str] = []
+    after = None
+    while True:
+        page = index.search(["p1", "p2"], "metformin", limit=1, mode="fts", after=after)
+        if not page:
+            break
+        seen.append(page[0]["file_id"])
+        after = (page[0]["rank"], page[0]["file_id"])
+
+    assert sorted(seen) == ["f1", "f3", "f4"]
+    assert len(seen) == 3
+
+
+def test_remove_drops_document_and_its_index_entries():
+    index = InMemorySearchIndex()
+    index.add("f1", "p1", "atorvastatin")
+    index.add("f2", "p1", "metformin")
+    index.remove("f1")
+
+    assert len(index) == 1
+    assert index.search(["p1"], "atorvastatin", limit=10) == []
+    assert "atorvastatin" not in index._word_docs
+    assert all(index._trigram_words.values())
+
+    index.remove("f2")
+    assert index._postings == {}
+    assert index._word_docs == {}
+    assert index._trigram_words == {}
+
+
+def test_re_adding_replaces_previous_text():
+    index = InMemorySearchIndex()
+    index.add("f1", "p1", "old report")
+    index.add("f1", "p1", "new report")
+
+    assert index.search(["p1"], "old", limit=10, mode="fts") == []
+    assert [row["file_id"] for row in index.search(["p1"], "new", limit=10)] == ["f1"]
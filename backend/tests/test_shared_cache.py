@@ -0,0 +1,62 @@
+import os
+import threading
+
+import pytest
+
+from app.utils.shared_cache import SharedFileCache
+
+
+def test_directory_is_created_private(tmp_path):
+    directory = tmp_path / "cache"
+    SharedFileCache(str(directory))
+    assert os.stat(directory).st_mode & 0o777 == 0o700
+
+
+def test_group_or_world_accessible_directory_is_refused(tmp_path):
+    directory = tmp_path / "cache"
+    directory.mkdir()
+    directory.chmod(0o777)
+    with pytest.raises(RuntimeError, match="0700"):
+        SharedFileCache(str(directory))
+
+
+def test_symlinked_directory_is_refused(tmp_path):
+    target = tmp_path / "target"
+    target.mkdir(mode=0o700)
+    link = tmp_path / "link"
+    link.symlink_to(target)
+    with pytest.raises(RuntimeError, match="not a directory"):
+        SharedFileCache(str(link))
+
+
+def test_entries_expire_and_check_key(tmp_path):
+    cache = SharedFileCache(str(tmp_path / "cache"))
+    cache.set("a", {"v": 1}, ttl_seconds=60)
+    cache.set("b", {"v": 2}, ttl_seconds=-1)
+
+    assert cache.get("a") == {"v": 1}
+    assert cache.get("b") is None
+    assert cache.prune() == 1
+
+
+def test_get_or_fill_runs_fill_once_under_contention(tmp_path):
+    cache = SharedFileCache(str(tmp_path / "cache"))
+    calls = 0
+    lock = threading.Lock()
+
+    def fill():
+        nonlocal calls
+        with lock:
+            calls += 1
+        return ["key"]
+
+    threads = [
+        threading.Thread(target=lambda: cache.get_or_fill("jwks", 60, fill)) for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert calls == 1
+    assert cache.get("jwks") == ["key"]
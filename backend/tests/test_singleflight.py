@@ -0,0 +1,81 @@
+import threading
+
+import pytest
+
+from app.utils.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_execution(wait_until):
+    flight: SingleFlight[int] = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = 0
+
+    def slow() -> int:
+        nonlocal calls
+        calls += 1
+        started.set()
+        release.wait(5)
+        return 42
+
+    results: list[tuple[int, bool]] = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", slow)))
+    leader.start()
+    assert started.wait(5)
+
+    followers = [
+        threading.Thread(target=lambda: results.append(flight.do("k", slow))) for _ in range(4)
+    ]
+    for thread in followers:
+        thread.start()
+    wait_until(lambda: flight.stats()["shared"] >= 4)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join(5)
+
+    assert calls == 1
+    assert sorted(results) == [(42, False)] + [(42, True)] * 4
+    assert flight.stats() == {"executed": 1, "shared": 4, "in_flight": 0}
+
+
+def test_error_propagates_to_followers_and_is_not_cached(wait_until):
+    flight: SingleFlight[int] = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def boom() -> int:
+        started.set()
+        release.wait(5)
+        raise ValueError("upstream down")
+
+    errors: list[BaseException] = []
+
+    def call() -> None:
+        try:
+            flight.do("k", boom)
+        except ValueError as exc:
+            errors.append(exc)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    assert started.wait(5)
+    follower = threading.Thread(target=call)
+    follower.start()
+    wait_until(lambda: flight.stats()["shared"] >= 1)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert len(errors) == 2
+    assert flight.do("k", lambda: 7) == (7, False)
+
+
+def test_different_keys_do_not_coalesce():
+    flight: SingleFlight[str] = SingleFlight()
+    assert flight.do("a", lambda: "a") == ("a", False)
+    assert flight.do("b", lambda: "b") == ("b", False)
+    assert flight.stats()["executed"] == 2
+
+    with pytest.raises(KeyError):
+        flight.do("c", lambda: {}["missing"])
+    assert flight.stats()["in_flight"] == 0
@@ -0,0 +1,94 @@
+import threading
+
+from app.services import ai_service
+from app.services.ai_service import SuggestionCache, SuggestionService, fingerprint
+
+
+class CountingGenerator:
+    def __init__(self, gate: threading.Event | None = None) -> None:
+        self.calls = 0
+        self._gate = gate
+
+    def generate(self, inputs):
+        self.calls += 1
+        if self._gate is not None:
+            self._gate.wait(5)
+        return [f"tip {self.calls}"]
+
+
+def test_cache_entry_expires_after_ttl(monkeypatch, clock):
+    monkeypatch.setattr(ai_service, "time", clock)
+    cache = SuggestionCache(ttl_seconds=60, max_entries=10)
+
+    cache.put("p1", "fp", ["a"])
+    clock.advance(59)
+    assert cache.get("p1", "fp").suggestions == ["a"]
+    clock.advance(1)
+    assert cache.get("p1", "fp") is None
+
+
+def test_cache_evicts_least_recently_used():
+    cache = SuggestionCache(ttl_seconds=60, max_entries=2)
+    cache.put("p1", "fp", ["1"])
+    cache.put("p2", "fp", ["2"])
+    assert cache.get("p1", "fp") is not None  # p2 is now least recent
+    cache.put("p3", "fp", ["3"])
+
+    assert cache.get("p2", "fp") is None
+    assert cache.get("p1", "fp") is not None
+    assert cache.get("p3", "fp") is not None
+
+
+def test_changed_inputs_miss_and_replace_entry():
+    cache = SuggestionCache(ttl_seconds=60, max_entries=10)
+    cache.put("p1", "old", ["stale"])
+
+    assert cache.get("p1", "new") is None
+    cache.put("p1", "new", ["fresh"])
+    assert cache.get("p1", "old") is None
+    assert cache.get("p1", "new").suggestions == ["fresh"]
+
+
+def test_fingerprint_ignores_key_order_but_not_values():
+    a = {"medications": [{"id": 1, "name": "metformin"}], "allergies": []}
+    b = {"allergies": [], "medications": [{"name": "metformin", "id": 1}]}
+    c = {"allergies": [], "medications": [{"name": "metformin", "id": 2}]}
+
+    assert fingerprint(a) == fingerprint(b)
+    assert fingerprint(a) != fingerprint(c)
+
+
+def test_service_generates_once_then_serves_cache():
+    generator = CountingGenerator()
+    service = SuggestionService(generator, SuggestionCache(ttl_seconds=60, max_entries=10))
+    inputs = {"medications": [{"id": 1}]}
+
+    first, first_cached = service.get_suggestions("p1", inputs)
+    second, second_cached = service.get_suggestions("p1", inputs)
+    assert (first_cached, second_cached) == (False, True)
+    assert first is second
+
+    service.get_suggestions("p1", {"medications": [{"id": 2}]})
+    assert generator.calls == 2
+
+
+def test_service_coalesces_concurrent_misses(wait_until):
+    gate = threading.Event()
+    generator = CountingGenerator(gate)
+    service = SuggestionService(generator, SuggestionCache(ttl_seconds=60, max_entries=10))
+    inputs = {"medications": [{"id": 1}]}
+
+    results: list[bool] = []
+    threads = [
+        threading.Thread(target=lambda: results.append(service.get_suggestions("p1", inputs)[1]))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    wait_until(lambda: service._flight.stats()["shared"] >= 4)
+    gate.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert generator.calls == 1
+    assert sorted(results) == [False, True, True, True, True]
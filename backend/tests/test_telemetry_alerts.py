@@ -0,0 +1,102 @@
+from fastapi import BackgroundTasks
+import pytest
+
+from app.models.telemetry import TelemetryCreateRequest
+from app.routers import telemetry as telemetry_router
+from app.services.telemetry_alerts import AlertEngine, Reading, ThresholdRule, canonical_value
+
+
+RULES = (ThresholdRule("heart_rate", low=40, high=130, cooldown_seconds=600),)
+
+
+def test_absolute_limit_alerts_once_per_cooldown(clock):
+    engine = AlertEngine(RULES, clock=clock)
+    kinds = [
+        [alert.kind for alert in engine.evaluate(Reading("p", "heart_rate", value, at))]
+        for value, at in [(150, 0), (155, 60), (80, 120), (160, 700)]
+    ]
+    assert kinds == [["high"], [], [], ["high"]]
+
+
+def test_window_change_uses_sliding_min_max(clock):
+    engine = AlertEngine(
+        (ThresholdRule("weight", max_window_change=2.0),), window_seconds=100, clock=clock
+    )
+    assert engine.evaluate_batch(
+        [Reading("p", "weight", 70.0, 0), Reading("p", "weight", 71.5, 50)]
+    ) == []
+    alerts = engine.evaluate(Reading("p", "weight", 72.5, 90))
+    assert [(a.kind, a.observed) for a in alerts] == [("window_change", 2.5)]
+    # 70.0 has left the window by t=160.
+    assert engine.evaluate(Reading("p", "weight", 73.0, 160)) == []
+
+
+def test_state_is_bounded_by_max_keys(clock):
+    engine = AlertEngine(RULES, max_keys=3, clock=clock)
+    for index in range(10):
+        engine.evaluate(Reading(f"p{index}", "heart_rate", 80, 0))
+
+    assert engine.metrics() == {"keys": 3, "evicted": 7}
+    assert engine.state("p0", "heart_rate") is None
+    assert engine.state("p9", "heart_rate") is not None
+
+
+def test_idle_keys_are_dropped_after_window(clock):
+    engine = AlertEngine(RULES, window_seconds=100, clock=clock)
+    engine.evaluate(Reading("idle", "heart_rate", 80, 0))
+    clock.advance(50)
+    engine.evaluate(Reading("busy", "heart_rate", 80, 50))
+    clock.advance(70)
+    engine.evaluate(Reading("busy", "heart_rate", 81, 120))
+
+    assert engine.state("idle", "heart_rate") is None
+    assert engine.state("busy", "heart_rate") is not None
+
+
+@pytest.mark.parametrize(
+    "metric_type, value, unit, expected",
+    [
+        ("blood_glucose", 5.5, "mmol/L", 99.088),
+        ("blood_glucose", 110, "mg/dL", 110),
+        ("temperature", 98.6, "°F", 37.0),
+        ("temperature", 37.2, " c ", 37.2),
+        ("weight", 154, "lbs", 69.853),
+        ("bp_systolic", 16, "kPa", 120.01),
+        ("spo2", 97, "%", 97),
+    ],
+)
+def test_canonical_value_converts_known_units(metric_type, value, unit, expected):
+    assert canonical_value(metric_type, value, unit) == pytest.approx(expected, abs=0.01)
+
+
+@pytest.mark.parametrize(
+    "metric_type, unit", [("blood_glucose", "mmol"), ("temperature", "K"), ("spo2", None)]
+)
+def test_canonical_value_rejects_unknown_units(metric_type, unit):
+    assert canonical_value(metric_type, 1.0, unit) is None
+
+
+class FakeTelemetryProvider:
+    def create_telemetry(self, profile_id, account_id, rows):
+        return [
+            {"profile_id": profile_id, "recorded_at": "2026-01-01T08:00:00+00:00", **row}
+            for row in rows
+        ]
+
+
+def test_ingest_converts_units_and_skips_unknown_ones(monkeypatch, clock):
+    engine = AlertEngine(clock=clock)
+    monkeypatch.setattr(telemetry_router, "get_data_provider", FakeTelemetryProvider)
+    monkeypatch.setattr(telemetry_router, "get_alert_engine", lambda: engine)
+    readings = [
+        TelemetryCreateRequest(metric_type="blood_glucose", value=5.5, unit="mmol/L"),
+        TelemetryCreateRequest(metric_type="temperature", value=98.6, unit="F"),
+        TelemetryCreateRequest(metric_type="heart_rate", value=20, unit="beats per fortnight"),
+        TelemetryCreateRequest(metric_type="spo2", value=88, unit="%"),
+    ]
+
+    inserted, alerts = telemetry_router._ingest("p", "a", readings, BackgroundTasks())
+
+    assert len(inserted) == 4
+    assert [(a["metric_type"], a["kind"], a["unit"]) for a in alerts] == [("spo2", "low", "%")]
+    assert engine.state("p", "heart_rate") is None
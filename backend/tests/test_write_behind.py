@@ -0,0 +1,114 @@
+import threading
+
+from app.services.write_behind import AccountWriteBuffer
+
+
+class SlowSink:
+    def __init__(self, fail: bool = False) -> None:
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.fail = fail
+        self.rows: list[dict] = []
+
+    def __call__(self, rows: list[dict]) -> None:
+        self.started.set()
+        self.release.wait(5)
+        if self.fail:
+            raise RuntimeError("db down")
+        self.rows.extend(rows)
+
+
+def test_writes_coalesce_last_write_wins(clock):
+    flushed: list[list[dict]] = []
+    buffer = AccountWriteBuffer(flushed.append, interval_seconds=60, max_pending=10, clock=clock)
+    buffer.set_push_token("a", "t1")
+    clock.advance(1)
+    buffer.merge_notif_prefs("a", {"email": False})
+    clock.advance(1)
+    buffer.set_push_token("a", "t2")
+    buffer.merge_notif_prefs("a", {"push": True})
+
+    assert buffer.flush() == 1
+    assert flushed == [
+        [
+            {
+                "id": "a",
+                "expo_push_token": "t2",
+                "notif_prefs": {"email": False, "push": True},
+                "written_at": {
+                    "expo_push_token": 2,
+                    "notif_prefs.email": 1,
+                    "notif_prefs.push": 2,
+                },
+            }
+        ]
+    ]
+    assert buffer.pending("a") is None
+
+
+def test_out_of_order_flushes_keep_the_newest_write(clock):
+    # Mirrors apply_account_settings in 005: a field is only written when
+    # its written_at is newer than the stored one.
+    stored = {"notif_prefs": {}, "written_at": {}}
+
+    def apply(rows: list[dict]) -> None:
+        for row in rows:
+            for key, value in row.get("notif_prefs", {}).items():
+                stamp = row["written_at"][f"notif_prefs.{key}"]
+                if stamp > stored["written_at"].get(f"notif_prefs.{key}", 0):
+                    stored["notif_prefs"][key] = value
+                    stored["written_at"][f"notif_prefs.{key}"] = stamp
+
+    worker_a = AccountWriteBuffer(apply, interval_seconds=60, max_pending=10, clock=clock)
+    worker_b = AccountWriteBuffer(apply, interval_seconds=60, max_pending=10, clock=clock)
+    clock.advance(10)
+    worker_a.merge_notif_prefs("acct", {"telemetry_alert": False})
+    clock.advance(1)
+    worker_b.merge_notif_prefs("acct", {"telemetry_alert": True})
+
+    worker_b.flush()
+    worker_a.flush()
+
+    assert stored["notif_prefs"] == {"telemetry_alert": True}
+
+
+def test_rows_stay_readable_while_flush_is_in_flight():
+    sink = SlowSink()
+    buffer = AccountWriteBuffer(sink, interval_seconds=60, max_pending=10)
+    buffer.set_push_token("a", "t1")
+
+    flusher = threading.Thread(target=buffer.flush)
+    flusher.start()
+    assert sink.started.wait(5)
+
+    assert buffer.pending("a") == {"expo_push_token": "t1"}
+    buffer.merge_notif_prefs("a", {"push": False})
+    assert buffer.pending("a") == {"expo_push_token": "t1", "notif_prefs": {"push": False}}
+
+    sink.release.set()
+    flusher.join(5)
+    assert buffer.pending("a") == {"notif_prefs": {"push": False}}
+    assert buffer.metrics()["in_flight"] == 0
+
+
+def test_failed_flush_requeues_under_newer_writes(clock):
+    sink = SlowSink(fail=True)
+    buffer = AccountWriteBuffer(sink, interval_seconds=60, max_pending=10, clock=clock)
+    buffer.set_push_token("a", "old")
+    clock.advance(5)
+
+    flusher = threading.Thread(target=buffer.flush)
+    flusher.start()
+    assert sink.started.wait(5)
+    buffer.set_push_token("a", "new")
+    sink.release.set()
+    flusher.join(5)
+
+    assert buffer.pending("a") == {"expo_push_token": "new"}
+    assert buffer.metrics()["errors"] == 1
+
+    sink.fail = False
+    assert buffer.flush() == 1
+    assert [(row["expo_push_token"], row["written_at"]) for row in sink.rows] == [
+        ("new", {"expo_push_token": 5.0})
+    ]
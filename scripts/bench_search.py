@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from app.services.search_index import InMemorySearchIndex  # noqa: E402
+
+
+FILLER = (
+    "patient report reviewed normal range follow up advised clinic visit history "
+    "examination findings within limits recommended continue current plan noted "
+    "laboratory sample collected fasting morning value reference interval"
+).split()
+TERMS = (
+    "metformin amlodipine atorvastatin levothyroxine insulin hba1c creatinine "
+    "hemoglobin cholesterol triglycerides thyroid hypertension diabetes asthma "
+    "salbutamol paracetamol vitamin ferritin platelets bilirubin"
+).split()
+
+
+def _document(rng: random.Random, planted: list[str], length: int) -> str:
+    words = [rng.choice(FILLER) for _ in range(length)]
+    for term in planted:
+        words[rng.randrange(length)] = term
+    return " ".join(words)
+
+
+def _typo(term: str, rng: random.Random) -> str:
+    index = rng.randrange(1, len(term) - 1)
+    return term[:index] + term[index + 1 :]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the in-memory search index.")
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--profiles", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--length", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    index = InMemorySearchIndex()
+    relevant: dict[tuple[str, str], set[str]] = {}
+
+    started = time.perf_counter()
+    for doc_number in range(args.docs):
+        file_id = f"{doc_number:08d}"
+        profile_id = f"p{rng.randrange(args.profiles)}"
+        planted = rng.sample(TERMS, 2)
+        index.add(file_id, profile_id, _document(rng, planted, args.length))
+        for term in planted:
+            relevant.setdefault((profile_id, term), set()).add(file_id)
+    build_seconds = time.perf_counter() - started
+
+    keys = list(relevant)
+    latencies: dict[str, list[float]] = {"exact": [], "typo": []}
+    precision: dict[str, list[float]] = {"exact": [], "typo": []}
+    for _ in range(args.queries):
+        profile_id, term = rng.choice(keys)
+        expected = relevant[(profile_id, term)]
+        for kind, query in (("exact", term), ("typo", _typo(term, rng))):
+            started = time.perf_counter()
+            rows = index.search([profile_id], query, args.k)
+            latencies[kind].append(time.perf_counter() - started)
+            if rows:
+                hits = sum(1 for row in rows if row["file_id"] in expected)
+                precision[kind].append(hits / min(len(expected), args.k))
+            else:
+                precision[kind].append(0.0)
+
+    print(f"indexed {len(index)} docs in {build_seconds:.2f}s")
+    for kind in ("exact", "typo"):
+        samples = sorted(latencies[kind])
+        p50 = samples[len(samples) // 2] * 1e3
+        p95 = samples[int(len(samples) * 0.95)] * 1e3
+        recall = statistics.fmean(precision[kind])
+        print(f"{kind:5}  p50 {p50:.3f} ms  p95 {p95:.3f} ms  recall@{args.k} {recall:.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
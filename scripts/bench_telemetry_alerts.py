@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import random
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from app.services.telemetry_alerts import AlertEngine, Reading  # noqa: E402
+
+
+BASELINES = {
+    "bp_systolic": (125.0, 12.0),
+    "bp_diastolic": (80.0, 8.0),
+    "blood_glucose": (120.0, 30.0),
+    "spo2": (97.0, 1.5),
+    "heart_rate": (75.0, 10.0),
+    "weight": (70.0, 0.4),
+    "temperature": (36.8, 0.4),
+    "respiratory_rate": (15.0, 2.0),
+}
+
+
+def synthetic_stream(profiles: int, readings: int, seed: int) -> list[Reading]:
+    """Readings every ~20 minutes per profile, round-robin, with rare spikes."""
+    rng = random.Random(seed)
+    metrics = list(BASELINES)
+    stream: list[Reading] = []
+    clock = 1_700_000_000.0
+    for index in range(readings):
+        metric_type = metrics[(index // profiles) % len(metrics)]
+        mean, spread = BASELINES[metric_type]
+        value = rng.gauss(mean, spread)
+        if rng.random() < 0.01:
+            value += spread * rng.choice((-6, 6))
+        stream.append(
+            Reading(
+                profile_id=f"p{index % profiles}",
+                metric_type=metric_type,
+                value=round(value, 1),
+                recorded_at=clock,
+            )
+        )
+        clock += 1200.0 / profiles
+    return stream
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay synthetic telemetry through AlertEngine.")
+    parser.add_argument("--profiles", type=int, default=1000)
+    parser.add_argument("--readings", type=int, default=500_000)
+    parser.add_argument("--batch", type=int, default=200, help="readings per evaluate_batch call")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    stream = synthetic_stream(args.profiles, args.readings, args.seed)
+
+    engine = AlertEngine()
+    started = time.perf_counter()
+    alerts = 0
+    for reading in stream:
+        alerts += len(engine.evaluate(reading))
+    single_seconds = time.perf_counter() - started
+
+    engine = AlertEngine()
+    started = time.perf_counter()
+    batch_alerts = 0
+    for start in range(0, len(stream), args.batch):
+        batch_alerts += len(engine.evaluate_batch(stream[start : start + args.batch]))
+    batch_seconds = time.perf_counter() - started
+
+    n = len(stream)
+    print(f"{n} readings, {args.profiles} profiles")
+    print(f"single  {n / single_seconds:12,.0f} readings/s  {single_seconds / n * 1e6:.2f} us/reading  {alerts} alerts")
+    print(f"batch   {n / batch_seconds:12,.0f} readings/s  {batch_seconds / n * 1e6:.2f} us/reading  {batch_alerts} alerts")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
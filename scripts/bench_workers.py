@@ -0,0 +1,115 @@
+"""Throughput and warm-start benchmark for multi-worker serving.
+
+Starts gunicorn (backend/gunicorn.conf.py) at each worker count, waits
+until /health answers, then drives a fixed number of concurrent clients
+at one endpoint for a fixed duration.
+
+    python scripts/bench_workers.py                       # /health at 1, 2, 4, 8 workers
+    python scripts/bench_workers.py --path /profiles --token "$JWT"
+
+Requires gunicorn and a backend/.env pointing at a Supabase project.
+"""
+
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import os
+from pathlib import Path
+import signal
+import subprocess
+import sys
+import time
+
+import httpx
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1] / "backend"
+
+
+def _wait_healthy(base_url: str, timeout: float) -> float:
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        try:
+            if httpx.get(base_url + "/health", timeout=1.0).status_code == 200:
+                return time.perf_counter() - started
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.05)
+    raise RuntimeError(f"server not healthy after {timeout}s")
+
+
+def _client_loop(url: str, headers: dict[str, str], deadline: float) -> tuple[list[float], int]:
+    latencies: list[float] = []
+    errors = 0
+    with httpx.Client(headers=headers, timeout=10.0) as client:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                response = client.get(url)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+    return latencies, errors
+
+
+def run(workers: int, args: argparse.Namespace) -> dict[str, float]:
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), BIND=f"127.0.0.1:{args.port}")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        startup = _wait_healthy(base_url, 60.0)
+        headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+        deadline = time.perf_counter() + args.duration
+        with ThreadPoolExecutor(max_workers=args.clients) as pool:
+            results = list(
+                pool.map(
+                    lambda _: _client_loop(base_url + args.path, headers, deadline),
+                    range(args.clients),
+                )
+            )
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+    latencies = sorted(latency for result in results for latency in result[0])
+    errors = sum(result[1] for result in results)
+    return {
+        "startup_s": startup,
+        "rps": len(latencies) / args.duration,
+        "p50_ms": latencies[len(latencies) // 2] * 1e3,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1e3,
+        "errors": errors,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark gunicorn at several worker counts.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--path", default="/health")
+    parser.add_argument("--token", help="bearer token for authenticated paths")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    print(f"{'workers':>7} {'startup s':>10} {'req/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for workers in args.workers:
+        stats = run(workers, args)
+        print(
+            f"{workers:>7} {stats['startup_s']:>10.2f} {stats['rps']:>10.0f} "
+            f"{stats['p50_ms']:>8.2f} {stats['p99_ms']:>8.2f} {stats['errors']:>7.0f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())